@@ -0,0 +1,361 @@
+"""Offline end-to-end benchmark harness for quickfix.py.
+
+Three pieces stand in for the outside world:
+
+- FakeForge, a local HTTP server that answers Codeberg and GitHub
+  "latest release" requests and serves mods.json and generated zip assets,
+  with configurable latency, error rate and Codeberg misses.
+- make_steam_tree(), which writes a synthetic Steam root with N libraries
+  and M appmanifests (plus game folders) to disk.
+- FakeWinreg, injected as quickfix.winreg so the registry lookup returns
+  the synthetic Steam root.
+
+run_quickfix() runs one command in-process against all three and returns
+its wall time; run_benchmark() times install --all, update --all and
+open-config for one catalog size.
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import quickfix
+
+FIRST_APPID = 100000
+
+
+def make_zip(mod_id, with_config=True):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(f"{mod_id}.asi", mod_id.encode() * 64)
+        zf.writestr("dsound.dll", b"dll" * 256)
+        if with_config:
+            zf.writestr(f"{mod_id}.ini", b"[Settings]\n")
+    return buf.getvalue()
+
+
+class FakeForge:
+    """Local stand-in for Codeberg, GitHub and the raw mods.json URL.
+
+    Routes:
+      /codeberg/api/v1/repos/<owner>/<repo>/releases/latest
+      /github/repos/<owner>/<repo>/releases/latest
+      /assets/<mod_id>-<tag>.zip
+      /mods.json
+
+    `latency` seconds are slept before every answer, `error_rate` of API
+    requests get a 503, and repos listed in `codeberg_missing` 404 on
+    Codeberg so the client falls back to GitHub.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.releases = {}          # repo -> (mod_id, tag)
+        self.codeberg_missing = set()
+        self.catalog = {}
+        self.assets = {}            # path -> bytes
+        self.requests = {"codeberg": 0, "github": 0, "assets": 0, "catalog": 0}
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def asset_url(self, mod_id, tag):
+        return f"{self.base_url}/assets/{mod_id}-{tag}.zip"
+
+    def publish(self, mod_id, repo, tag, with_config=True):
+        """Make `tag` the latest release of repo; returns (url, sha256, size)."""
+        data = make_zip(mod_id, with_config)
+        url = self.asset_url(mod_id, tag)
+        with self.lock:
+            self.releases[repo] = (mod_id, tag)
+            self.assets[f"/assets/{mod_id}-{tag}.zip"] = data
+        return url, hashlib.sha256(data).hexdigest(), len(data)
+
+    def _release_json(self, repo):
+        mod_id, tag = self.releases[repo]
+        return {"tag_name": tag, "assets": [
+            {"name": f"{mod_id}.zip", "browser_download_url": self.asset_url(mod_id, tag)}]}
+
+    def handle(self, path):
+        """Return (status, headers, body) for a GET of path."""
+        if self.latency:
+            time.sleep(self.latency)
+        if path == "/mods.json":
+            self._count("catalog")
+            return 200, {"ETag": '"catalog"'}, json.dumps(self.catalog).encode()
+        if path in self.assets:
+            self._count("assets")
+            return 200, {}, self.assets[path]
+        for prefix, host in (("/codeberg/api/v1/repos/", "codeberg"), ("/github/repos/", "github")):
+            if path.startswith(prefix) and path.endswith("/releases/latest"):
+                self._count(host)
+                repo = path[len(prefix):-len("/releases/latest")]
+                with self.lock:
+                    failed = self.random.random() < self.error_rate
+                if failed:
+                    return 503, {}, b""
+                if repo not in self.releases or (host == "codeberg" and repo in self.codeberg_missing):
+                    return 404, {}, b"{}"
+                return 200, {}, json.dumps(self._release_json(repo)).encode()
+        return 404, {}, b""
+
+    def _count(self, key):
+        with self.lock:
+            self.requests[key] += 1
+
+    def __enter__(self):
+        forge = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, headers, body = forge.handle(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_steam_tree(root, appids, libraries=2):
+    """Write a Steam root whose appids are spread over `libraries` libraries.
+
+    Library 0 is the Steam root itself; the others are listed in its
+    libraryfolders.vdf. Every game gets an appmanifest, an install folder
+    with a Binaries/Win64 subfolder and some content to skip when searching.
+    Returns (steam_root, {appid: install_path}).
+    """
+    libs = [os.path.join(root, "Steam")] + [os.path.join(root, f"Library{i}") for i in range(1, libraries)]
+    for lib in libs:
+        os.makedirs(os.path.join(lib, "steamapps", "common"), exist_ok=True)
+    with open(os.path.join(libs[0], "steamapps", "libraryfolders.vdf"), "w", encoding="utf-8") as f:
+        f.write('"libraryfolders"\n{\n')
+        for i, lib in enumerate(libs):
+            f.write(f'\t"{i}"\n\t{{\n\t\t"path"\t\t"{lib}"\n\t}}\n')
+        f.write("}\n")
+
+    installs = {}
+    for i, appid in enumerate(appids):
+        steamapps = os.path.join(libs[i % len(libs)], "steamapps")
+        installdir = f"Game{appid}"
+        with open(os.path.join(steamapps, f"appmanifest_{appid}.acf"), "w", encoding="utf-8") as f:
+            f.write(f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"Game {appid}"\n'
+                    f'\t"StateFlags"\t\t"4"\n\t"installdir"\t\t"{installdir}"\n}}\n')
+        game = os.path.join(steamapps, "common", installdir)
+        os.makedirs(os.path.join(game, installdir, "Binaries", "Win64"))
+        os.makedirs(os.path.join(game, installdir, "Content", "Paks"))
+        with open(os.path.join(game, installdir, "Content", "Paks", "pakchunk0.pak"), "wb") as f:
+            f.write(b"\0" * 1024)
+        installs[appid] = game
+    return libs[0], installs
+
+
+class FakeWinreg:
+    """Just enough of winreg for get_steam_root()."""
+
+    HKEY_CURRENT_USER = object()
+
+    def __init__(self, steam_path):
+        self.steam_path = steam_path
+
+    def OpenKey(self, hive, path):
+        return path
+
+    def QueryValueEx(self, key, name):
+        if key == r"Software\Valve\Steam" and name == "SteamPath":
+            return self.steam_path, 1
+        raise FileNotFoundError(name)
+
+
+def make_catalog(forge, n_mods, installed_appids, pinned_fraction=0.5, codeberg_missing=0.1, seed=0):
+    """Publish n_mods releases on forge and return the matching mods.json.
+
+    The first len(installed_appids) mods target installed games; the rest
+    target appids that are not installed. Roughly pinned_fraction of the
+    entries carry pinned release data, codeberg_missing of the repos only
+    exist on GitHub, and every other mod ships its config file in the zip
+    (the rest rely on a copy already in the game folder).
+    """
+    rng = random.Random(seed)
+    mods = {}
+    for i in range(n_mods):
+        mod_id = f"Bench{i:05d}Fix"
+        repo = f"Lyall/{mod_id}"
+        appid = installed_appids[i] if i < len(installed_appids) else FIRST_APPID + n_mods + i
+        url, sha256, size = forge.publish(mod_id, repo, "v1.0", with_config=i % 2 == 0)
+        if rng.random() < codeberg_missing:
+            forge.codeberg_missing.add(repo)
+        mod = {"repo": repo, "config_files": [f"{mod_id}.ini"], "games": [{"steam_appid": appid}]}
+        if rng.random() < pinned_fraction:
+            mod.update(derived_release="v1.0", download_url=url, sha256=sha256, size=size)
+        mods[mod_id] = mod
+    forge.catalog = mods
+    return mods
+
+
+def reset_quickfix_state():
+    """Drop the per-process caches quickfix keeps in module globals."""
+    quickfix._steam_index = None
+    quickfix._game_names = None
+    quickfix._installed_store = None
+    quickfix._release_cache = None
+    quickfix._host_schedulers = {}
+    quickfix._http_sessions = {}
+    quickfix._download_rate_limiter = None
+    quickfix._trace_events = None
+
+
+@contextlib.contextmanager
+def _patched(obj, **attrs):
+    saved = {name: getattr(obj, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(obj, name, value)
+
+
+def _restore_env(name, value):
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+class _NoOpener:
+    """Replaces quickfix.subprocess so open-config does not launch an editor."""
+
+    @staticmethod
+    def run(args, **kwargs):
+        return None
+
+
+def run_quickfix(argv, forge, steam_root, appdata, quiet=True):
+    """Run quickfix.main(argv) against forge and the synthetic Steam root.
+
+    Returns the wall time in seconds. Module state is reset first so each
+    command starts as cold as a new process would (minus interpreter start).
+    """
+    reset_quickfix_state()
+    saved_appdata = os.environ.get("APPDATA")
+    os.environ["APPDATA"] = appdata
+    with contextlib.ExitStack() as stack:
+        stack.callback(_restore_env, "APPDATA", saved_appdata)
+        stack.enter_context(_patched(
+            quickfix,
+            winreg=FakeWinreg(steam_root),
+            subprocess=_NoOpener,
+            CATALOG_URL=f"{forge.base_url}/mods.json",
+            CATALOG_FEED_URL=f"{forge.base_url}/catalog",
+            CODEBERG_API=f"{forge.base_url}/codeberg/api/v1",
+            GITHUB_API=f"{forge.base_url}/github",
+            RETRY_BASE_DELAY=0.01,
+        ))
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        # main() sets module-level options (DEBUG_MODE, HTTP_TIMEOUT, ...) from argv.
+        stack.enter_context(_patched(quickfix, **{k: v for k, v in vars(quickfix).items() if k.isupper()}))
+        start = time.perf_counter()
+        quickfix.main(list(argv))
+        elapsed = time.perf_counter() - start
+    if quickfix._installed_store is not None:
+        quickfix._installed_store.conn.close()
+    reset_quickfix_state()
+    return elapsed
+
+
+def run_benchmark(workdir, n_mods, installed=None, libraries=2, latency=0.0, error_rate=0.0,
+                  update_fraction=0.1, open_config_samples=10, jobs=None, quiet=True):
+    """Time install --all, update --all and open-config for one catalog size.
+
+    Returns a list of {"mods", "command", "seconds", "requests"} dicts.
+    """
+    installed = max(1, n_mods // 10) if installed is None else installed
+    appids = [FIRST_APPID + i for i in range(installed)]
+    steam_root, installs = make_steam_tree(os.path.join(workdir, "steam"), appids, libraries)
+    appdata = os.path.join(workdir, "appdata")
+    extra = ["--jobs", str(jobs)] if jobs else []
+    results = []
+
+    with FakeForge(latency=latency, error_rate=error_rate) as forge:
+        mods = make_catalog(forge, n_mods, appids)
+        # Mods whose zip lacks the config find the game's own copy by searching.
+        for i, appid in enumerate(appids[1::2]):
+            mod_id = list(mods)[2 * i + 1]
+            game = installs[appid]
+            with open(os.path.join(game, os.path.basename(game), "Binaries", "Win64", f"{mod_id}.ini"), "w") as f:
+                f.write("[Settings]\n")
+
+        def timed(label, argv):
+            before = dict(forge.requests)
+            seconds = run_quickfix(argv, forge, steam_root, appdata, quiet=quiet)
+            requests = {k: forge.requests[k] - before[k] for k in before}
+            results.append({"mods": n_mods, "command": label, "seconds": round(seconds, 4),
+                            "requests": requests})
+
+        timed("install --all", ["install", "--all", *extra])
+
+        # Publish a new release for a slice of the installed mods.
+        installed_ids = list(mods)[:installed]
+        for i, mod_id in enumerate(installed_ids[:max(1, int(installed * update_fraction))]):
+            forge.publish(mod_id, mods[mod_id]["repo"], "v1.1", with_config=i % 2 == 0)
+        timed("update --all", ["update", "--all", "--live", "--release-ttl", "0", *extra])
+
+        samples = installed_ids[:open_config_samples]
+        before = dict(forge.requests)
+        start = time.perf_counter()
+        for mod_id in samples:
+            run_quickfix(["open-config", mod_id, "--offline"], forge, steam_root, appdata, quiet=quiet)
+        results.append({"mods": n_mods, "command": "open-config",
+                        "seconds": round((time.perf_counter() - start) / max(1, len(samples)), 4),
+                        "requests": {k: forge.requests[k] - before[k] for k in before}})
+    return results
+
+
+def check_budget(results, budget):
+    """Return a message for every result above its ceiling in budget.
+
+    budget maps str(mods) -> command -> {"seconds": max, "requests": {key: max}}
+    (see benchmarks/budget.json); sizes and commands it does not list are not checked.
+    """
+    violations = []
+    for run in results:
+        limits = budget.get(str(run["mods"]), {}).get(run["command"])
+        if not limits:
+            continue
+        label = f"{run['mods']} mods {run['command']}"
+        if "seconds" in limits and run["seconds"] > limits["seconds"]:
+            violations.append(f"{label}: {run['seconds']:.3f} s > {limits['seconds']} s")
+        for key, ceiling in limits.get("requests", {}).items():
+            count = run["requests"].get(key, 0)
+            if count > ceiling:
+                violations.append(f"{label}: {count} {key} requests > {ceiling}")
+    return violations
@@ -0,0 +1,62 @@
+"""Run the offline benchmark suite and print a timing table.
+
+    python benchmarks/run.py                       # 100, 1000 and 10000 mods
+    python benchmarks/run.py --sizes 100 1000 --json results.json
+    python benchmarks/run.py --latency 0.02 --error-rate 0.05
+    python benchmarks/run.py --budget benchmarks/budget.json   # fail on regressions
+
+Each size gets a fresh temp dir: a synthetic Steam tree with --installed
+games (default: a tenth of the catalog) and a local fake Codeberg/GitHub.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import check_budget, run_benchmark  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuickFix offline benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Catalog sizes to run")
+    parser.add_argument("--installed", type=int, help="Installed games per run (default: a tenth of the catalog)")
+    parser.add_argument("--libraries", type=int, default=2, help="Steam libraries to spread games over")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake server waits before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests answered with 503")
+    parser.add_argument("--jobs", type=int, help="Passed to quickfix as --jobs")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--budget", help="JSON file of time and request ceilings; exit 1 if any is exceeded")
+    parser.add_argument("--verbose", action="store_true", help="Show quickfix's own output")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix=f"quickfix-bench-{size}-") as workdir:
+            runs = run_benchmark(workdir, size, installed=args.installed, libraries=args.libraries,
+                                 latency=args.latency, error_rate=args.error_rate, jobs=args.jobs,
+                                 quiet=not args.verbose)
+        for run in runs:
+            api = run["requests"].get("codeberg", 0) + run["requests"].get("github", 0)
+            print(f"{run['mods']:>6} mods  {run['command']:<14} {run['seconds']:>9.3f} s  "
+                  f"{api:>6} API  {run['requests'].get('assets', 0):>6} downloads")
+        results.extend(runs)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget:
+        with open(args.budget, "r", encoding="utf-8") as f:
+            violations = check_budget(results, json.load(f))
+        for message in violations:
+            print(f"Over budget: {message}")
+        if violations:
+            sys.exit(1)
+        print(f"All results within {args.budget}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,394 @@
+import time
+# Taken before the other imports so --startup-profile can report their cost.
+_process_started = time.perf_counter()
 import argparse
+import functools
+import gzip
+import hashlib
 import json
+import mmap
+from concurrent.futures import ThreadPoolExecutor
 import os
-import requests
 import subprocess
-import tempfile
 import zipfile
-import time
+import zlib
 import platform
+import random
 import re
-import winreg
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urlparse
+
+# requests, asyncio and winreg are imported where they are used, so
+# local-only commands (list-installed, cache, verify, --version) start
+# without them. winreg is bound on the first registry lookup; the
+# benchmarks inject a stand-in here.
+winreg = None
 
 __version__ = "1.0.5"
 
 DEBUG_MODE = False
+# When True, catalog entries with derived release data install straight from
+# their pinned download_url; --live turns this off to query the release APIs.
+USE_PINNED_RELEASES = True
+# Set from --steam-root / --steam-dir; the registry is only consulted when no
+# explicit Steam root is given.
+STEAM_ROOT = None
+EXTRA_STEAM_LIBRARIES = []
+# --rescan ignores the on-disk Steam index cache and rebuilds it from scratch.
+USE_STEAM_INDEX_CACHE = True
+# --full-extract rewrites every file instead of only those whose CRC changed.
+INCREMENTAL_EXTRACT = True
 INSTALLED_MODS_FILE = "installed.json"
+STATE_DB_FILE = "state.db"
+STATE_BATCH_SIZE = 25
+# Appid of state rows migrated from installed.json, which only knew the mod.
+LEGACY_APPID = 0
+STEAM_INDEX_CACHE_FILE = "steam_index.json"
+STEAM_INDEX_CACHE_VERSION = 2
+GAME_NAMES_FILE = "game_names.json"
+# Local catalog cache: compact JSON {"schema", "by_appid", "mods"}. Caches
+# from before the schema-versioned artifact are plain mods.json copies.
+LOCAL_CATALOG_FILE = "catalog.v1.json"
+LOCAL_MODS_JSON_FILE = "mods.json"
+CATALOG_META_FILE = "mods.meta.json"
+DOWNLOAD_CACHE_DIR = "downloads"
+# Interrupted downloads stay in the cache as <name>.part (+ .part.json with
+# the ETag/Last-Modified to resume against) for up to a week.
+PARTIAL_SUFFIX = ".part"
+PARTIAL_MAX_AGE = 7 * 24 * 3600
+# LRU cap for the download cache; --cache-size overrides it (in MB).
+DOWNLOAD_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+MANIFESTS_DIR = "manifests"
+MANIFEST_SCHEMA = 1
+CONFIG_PATHS_FILE = "config_paths.json"
+# open-config's fallback search: fix configs sit near the executable, so stay
+# shallow and skip the folders that hold most of a game's files.
+CONFIG_SEARCH_MAX_DEPTH = 6
+CONFIG_SEARCH_PRUNE = frozenset({
+    "content", "paks", "movies", "splash", "localization", "shadercache",
+    "_commonredist", "redist", "directx", "__overlay", ".git",
+})
+# Release lookups are cached per host and repo for RELEASE_CACHE_TTL seconds
+# (--release-ttl), then revalidated with If-None-Match; 404s are cached too.
+RELEASE_CACHE_FILE = "releases.json"
+RELEASE_CACHE_VERSION = 1
+RELEASE_CACHE_TTL = 3600
+CATALOG_URL = "https://raw.githubusercontent.com/sharkusmanch/quickfix/master/mods.json"
+# Revision feed published by scripts/catalog_feed.py: index.json plus one
+# delta per revision. Further behind than this, a full download is cheaper.
+CATALOG_FEED_URL = "https://raw.githubusercontent.com/sharkusmanch/quickfix/master/catalog"
+CATALOG_MAX_DELTAS = 24
+# Full downloads prefer the feed's gzipped artifact (schema header plus a
+# precomputed appid index) and fall back to mods.json when it is missing or
+# uses a schema this version does not know.
+CATALOG_SCHEMA = 1
+CATALOG_ARTIFACT_NAME = f"mods.v{CATALOG_SCHEMA}.json.gz"
 CODEBERG_API = "https://codeberg.org/api/v1"
 GITHUB_API = "https://api.github.com"
+# Release lookups are network-bound, so --all runs resolve them on a small pool.
+DEFAULT_JOBS = 8
+APPMANIFEST_RE = re.compile(r"appmanifest_(\d+)\.acf$")
+# watch: Steam sets an app manifest's StateFlags to 4 (fully installed) once
+# a download or update has finished. Libraries are polled every
+# WATCH_POLL_INTERVAL seconds unless watchdog is installed; native events
+# are coalesced for WATCH_SETTLE seconds since Steam rewrites manifests often.
+STEAM_STATE_FULLY_INSTALLED = 4
+WATCH_POLL_INTERVAL = 5
+WATCH_SETTLE = 2
+# HTTP transport: one keep-alive session per host. --timeout and --retries
+# override the API defaults; downloads get a longer read timeout.
+HTTP_TIMEOUT = 10
+DOWNLOAD_TIMEOUT = 30
+HTTP_RETRIES = 3
+HTTP_POOL_SIZE = DEFAULT_JOBS
+# Hosts each session keeps pools for: github.com downloads redirect to a
+# githubusercontent.com host, and both connections should stay warm.
+HTTP_POOL_HOSTS = 4
+RETRY_BASE_DELAY = 1.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Rate limits: requests to a host whose budget is spent (X-RateLimit-Remaining
+# 0, or a Retry-After) wait for the reset if it is this close, else are deferred.
+RATE_LIMIT_MAX_WAIT = 30
+# Downloads start with 64 KB reads and double up to 1 MB while the socket
+# keeps filling the buffer, so small fixes stay cheap and big ones stream fast.
+DOWNLOAD_MIN_CHUNK = 64 * 1024
+DOWNLOAD_MAX_CHUNK = 1024 * 1024
+# Bulk installs prefetch zips on this many threads; --limit-rate caps the
+# combined bandwidth of all of them.
+DEFAULT_DOWNLOAD_JOBS = 4
+# Bulk installs extract (and hash cached archives) on this many threads.
+DEFAULT_EXTRACT_JOBS = 2
+
+_steam_index = None
+_steam_index_lock = threading.Lock()
+_game_names = None
+_installed_store = None
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+_download_rate_limiter = None
+_host_schedulers = {}
+_host_schedulers_lock = threading.Lock()
+_release_cache = None
+_release_cache_lock = threading.Lock()
+# (mods, {appid: [mod_id]}) for the catalog last loaded or saved locally.
+_catalog_appid_index = None
+# Chrome trace events recorded by trace_span; None unless --trace is given.
+_trace_events = None
+_trace_lock = threading.Lock()
+
+class DownloadError(Exception):
+    """A download was rejected: oversized, truncated or failed SHA-256 verification."""
+
+class RateLimitDeferred(Exception):
+    """A request was not sent because its host's rate-limit budget is spent."""
+
+    def __init__(self, host, reset_at):
+        super().__init__(f"{host} rate limit exhausted until {datetime.fromtimestamp(reset_at):%H:%M}")
+        self.host = host
+        self.reset_at = reset_at
+
+class HostScheduler:
+    """Admits requests to one host within its advertised rate-limit budget.
+
+    Tracks X-RateLimit-Remaining/-Reset and Retry-After from every response.
+    While the budget is unknown up to max_concurrency requests run at once;
+    once known, no more requests are in flight than the budget has left.
+    When the budget is spent, acquire() waits for the reset if it is within
+    RATE_LIMIT_MAX_WAIT seconds and raises RateLimitDeferred otherwise.
+    """
+
+    def __init__(self, host, max_concurrency):
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.remaining = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+    def _limit(self, now):
+        if self.remaining is None or now >= self.reset_at:
+            return self.max_concurrency
+        return min(self.max_concurrency, self.remaining)
+
+    def _resume_at(self, now):
+        """When the budget allows another request, or None if it does now."""
+        if now < self.blocked_until:
+            return self.blocked_until
+        if self._limit(now) <= 0:
+            return self.reset_at
+        return None
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                now = time.time()
+                resume_at = self._resume_at(now)
+                if resume_at is None:
+                    if self.in_flight < self._limit(now):
+                        self.in_flight += 1
+                        return
+                    self.cond.wait()
+                    continue
+                if resume_at - now > RATE_LIMIT_MAX_WAIT:
+                    raise RateLimitDeferred(self.host, resume_at)
+                debug_print(f"{self.host} rate limit reached; waiting {resume_at - now:.0f}s")
+                self.cond.wait(resume_at - now)
+
+    def release(self, response=None):
+        with self.cond:
+            self.in_flight -= 1
+            if response is not None:
+                self._observe(response.headers, response.status_code)
+            self.cond.notify_all()
+
+    def _observe(self, headers, status):
+        now = time.time()
+        try:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                self.reset_at = float(headers.get("X-RateLimit-Reset", now + 60))
+        except ValueError:
+            pass
+        retry_after = headers.get("Retry-After")
+        if retry_after and status in (403, 429, 503):
+            try:
+                self.blocked_until = max(self.blocked_until, now + float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; the backoff in http_get covers it
+
+    def rate_limited_until(self, response):
+        """For a 403/429 caused by the spent budget, when it resets; else None."""
+        if response.status_code not in (403, 429):
+            return None
+        with self.cond:
+            return self._resume_at(time.time())
+
+class RateLimiter:
+    """Token bucket shared by every download thread, in bytes per second.
+
+    consume() lets the bucket go into debt and sleeps the caller until the
+    debt is repaid, so the combined rate of all threads stays at the cap.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.allowance = rate
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount):
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate)
+            self.last = now
+            self.allowance -= amount
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+def parse_rate(value):
+    """Parse a --limit-rate value such as 500K or 2M into bytes per second."""
+    units = {"k": 1024, "m": 1024 * 1024}
+    value = value.strip().lower().removesuffix("b")
+    multiplier = units.get(value[-1:], 1)
+    number = value[:-1] if value[-1:] in units else value
+    rate = float(number) * multiplier
+    if rate <= 0:
+        raise ValueError(f"rate must be positive: {value}")
+    return rate
 
 def debug_print(message):
     if DEBUG_MODE:
         print(f"[DEBUG] {message}")
 
-def github_get(url):
-    headers = {"Accept": "application/vnd.github+json"}
+@contextmanager
+def trace_span(name, **args):
+    """Time the block as a Chrome trace "complete" event when --trace is on.
+
+    Yields the span's args dict so the block can attach results such as an
+    HTTP status or byte count. Spans land on the current thread's track, so
+    spans opened inside others on the same thread show up nested.
+    """
+    if _trace_events is None:
+        yield args
+        return
+    begin = time.perf_counter()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        event = {"name": name, "ph": "X", "pid": os.getpid(), "tid": threading.current_thread().name,
+                 "ts": round((begin - _process_started) * 1e6),
+                 "dur": round((time.perf_counter() - begin) * 1e6), "args": args}
+        with _trace_lock:
+            _trace_events.append(event)
+
+def traced(name, describe=None):
+    """Decorator form of trace_span; describe(*args, **kwargs) returns the span args."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace_events is None:
+                return func(*args, **kwargs)
+            with trace_span(name, **(describe(*args, **kwargs) if describe else {})):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def write_trace(path):
+    """Write the recorded spans as a Chrome/Perfetto trace JSON file."""
+    with _trace_lock:
+        events = list(_trace_events or [])
+    # Chrome wants numeric thread ids; name each track after its thread.
+    tids = {}
+    for event in events:
+        event["tid"] = tids.setdefault(event["tid"], len(tids) + 1)
+    metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for name, tid in tids.items()]
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    except OSError as e:
+        print(f"[WARN] Failed to write trace to {path}: {e}")
+
+def get_http_session(host):
+    """Return the shared keep-alive requests.Session for host."""
+    import requests
+    with _http_sessions_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = f"QuickFix/{__version__}"
+            _http_sessions[host] = session
+        return session
+
+def get_host_scheduler(host):
+    """Return the shared HostScheduler for host."""
+    with _host_schedulers_lock:
+        scheduler = _host_schedulers.get(host)
+        if scheduler is None:
+            scheduler = _host_schedulers[host] = HostScheduler(host, HTTP_POOL_SIZE)
+        return scheduler
+
+def _retry_delay(attempt):
+    """Exponential backoff with jitter: 1-2 s, 2-4 s, 4-8 s, ..."""
+    delay = RETRY_BASE_DELAY * 2 ** attempt
+    return delay + random.uniform(0, delay)
+
+def http_get(url, headers=None, timeout=None, stream=False, retries=None):
+    """GET url through the pooled session for its host.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff and jitter; any other response (including 4xx,
+    which is a definitive answer) is returned to the caller as-is.
+    Requests are admitted by the host's HostScheduler, so this raises
+    RateLimitDeferred instead of sending when the rate limit is spent.
+    """
+    import requests
+    host = urlparse(url).netloc
+    session = get_http_session(host)
+    scheduler = get_host_scheduler(host)
+    retries = max(1, HTTP_RETRIES if retries is None else retries)
+    for attempt in range(retries):
+        last_attempt = attempt == retries - 1
+        scheduler.acquire()
+        try:
+            with trace_span("http GET", host=host, path=urlparse(url).path, attempt=attempt + 1) as span:
+                response = session.get(url, headers=headers, timeout=timeout or HTTP_TIMEOUT, stream=stream)
+                span["status"] = response.status_code
+                span["bytes"] = int(response.headers.get("Content-Length") or 0)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            scheduler.release()
+            if last_attempt:
+                raise
+            debug_print(f"Request to {url} failed ({e}); retrying")
+        else:
+            scheduler.release(response)
+            limited_until = scheduler.rate_limited_until(response)
+            if limited_until:
+                response.close()
+                if last_attempt:
+                    raise RateLimitDeferred(host, limited_until)
+                debug_print(f"Request to {url} was rate limited; retrying")
+                continue  # the scheduler waits out the limit (or defers) before the retry
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            debug_print(f"Request to {url} returned {response.status_code}; retrying")
+            response.close()
+        time.sleep(_retry_delay(attempt))
+
+def github_get(url, headers=None):
+    headers = {"Accept": "application/vnd.github+json", **(headers or {})}
     token = os.environ.get("GITHUB_TOKEN")
 
     if token:
@@ -32,40 +397,232 @@ def github_get(url):
     else:
         debug_print(f"🌐 Public GitHub request: {url}")
 
-    return requests.get(url, headers=headers, timeout=10)
+    return http_get(url, headers=headers)
 
-def codeberg_get(url):
-    headers = {}
+def codeberg_get(url, headers=None):
+    headers = dict(headers or {})
     API_TOKEN = os.environ.get("CODEBERG_TOKEN")
     if API_TOKEN:
         debug_print(f"🔒 Authenticated Codeberg request: {url}")
         headers["Authorization"] = f"token {API_TOKEN}"
-    return requests.get(url, headers=headers, timeout=10)
+    return http_get(url, headers=headers)
+
+def fetch_latest_mods_json(etag=None):
+    """Fetch mods.json from GitHub; returns (mods, etag).
+
+    With an etag the request is conditional and mods is None when GitHub
+    answers 304 Not Modified.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = http_get(CATALOG_URL, headers=headers)
+    if etag and response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return response.json(), response.headers.get("ETag")
+
+def fetch_catalog_artifact(etag=None):
+    """Fetch the compressed catalog artifact; returns (envelope, etag), or None.
+
+    None means the artifact is not published or has an unknown schema, and
+    the caller should fetch mods.json. With an etag the request is
+    conditional and envelope is None on a 304.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = http_get(f"{CATALOG_FEED_URL}/{CATALOG_ARTIFACT_NAME}", headers=headers)
+    if response.status_code == 404:
+        return None
+    if etag and response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    data = response.content
+    # Served as a plain .gz file, unless a proxy already decoded it.
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    envelope = json.loads(data)
+    if envelope.get("schema") != CATALOG_SCHEMA:
+        debug_print(f"Catalog artifact schema {envelope.get('schema')} unsupported; using mods.json")
+        return None
+    if catalog_digest(envelope["mods"]) != envelope.get("sha256"):
+        debug_print("Catalog artifact does not match its digest; using mods.json")
+        return None
+    return envelope, response.headers.get("ETag")
 
-def fetch_latest_mods_json():
-    url = "https://raw.githubusercontent.com/sharkusmanch/quickfix/master/mods.json"
-    print("[INFO] Fetching latest mods.json from GitHub...")
-    response = requests.get(url, timeout=10)
+def fetch_catalog_index():
+    """Return the catalog feed's index.json, or None if the feed is not published."""
+    response = http_get(f"{CATALOG_FEED_URL}/index.json")
+    if response.status_code == 404:
+        return None
     response.raise_for_status()
     return response.json()
 
-def load_installed_mods():
-    appdata_path = os.getenv("APPDATA")
-    installed_mods_path = os.path.join(appdata_path, "QuickFix", INSTALLED_MODS_FILE)
-    if os.path.exists(installed_mods_path):
-        with open(installed_mods_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    else:
-        return {}
+def catalog_digest(mods):
+    """SHA-256 of the catalog's canonical JSON, as published in the feed index."""
+    canonical = json.dumps(mods, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def catalog_revision(mods, index):
+    """index's revision if mods is exactly that revision, else None."""
+    if index and catalog_digest(mods) == index.get("sha256"):
+        return index.get("revision")
+    return None
+
+def apply_catalog_deltas(cached_mods, revision, index):
+    """Bring cached_mods from `revision` up to index's revision using deltas.
+
+    Returns the updated catalog, or None when the gap is larger than
+    CATALOG_MAX_DELTAS, the deltas needed are no longer published, or the
+    result does not match the index digest. The caller then downloads the
+    full mods.json instead.
+    """
+    target = index["revision"]
+    if target - revision > CATALOG_MAX_DELTAS or revision + 1 < index.get("oldest_delta", 1):
+        debug_print(f"Catalog revision {revision} too far behind {target} for deltas")
+        return None
+    mods = dict(cached_mods)
+    for number in range(revision + 1, target + 1):
+        response = http_get(f"{CATALOG_FEED_URL}/deltas/{number}.json")
+        if response.status_code != 200:
+            debug_print(f"Catalog delta {number} unavailable ({response.status_code})")
+            return None
+        delta = response.json()
+        mods.update(delta.get("set", {}))
+        for mod_id in delta.get("remove", []):
+            mods.pop(mod_id, None)
+    if catalog_digest(mods) != index.get("sha256"):
+        debug_print("Catalog deltas did not reproduce the published revision")
+        return None
+    return mods
 
-def save_installed_mods(mods):
-    appdata_path = os.getenv("APPDATA")
-    installed_mods_path = os.path.join(appdata_path, "QuickFix", INSTALLED_MODS_FILE)
-    os.makedirs(os.path.dirname(installed_mods_path), exist_ok=True)
-    with open(installed_mods_path, "w", encoding="utf-8") as f:
-        json.dump(mods, f, indent=2, ensure_ascii=False)
+def get_quickfix_dir():
+    """%APPDATA%\\QuickFix, or ~/QuickFix where APPDATA is not set."""
+    return os.path.join(os.getenv("APPDATA") or os.path.expanduser("~"), "QuickFix")
 
+def _write_json_atomic(path, data, **dump_kwargs):
+    """Write data as JSON to path via a temp file and os.replace.
+
+    Other QuickFix processes (and the catalog-refresh thread) may read these
+    files at any time, so they must never see a torn write.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(temp_path, path)
+
+class InstalledStore:
+    """Installed-mod state in SQLite, keyed by (mod_id, appid).
+
+    The database runs in WAL mode, so concurrent QuickFix processes can read
+    while one writes. Writes commit immediately unless they happen inside
+    batch(), which commits every STATE_BATCH_SIZE records and on exit.
+    Rows migrated from the old installed.json (which only knew the mod)
+    use LEGACY_APPID. They only mark the mod as installed, so `update`
+    still considers it; the first per-game install replaces them.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS installs ("
+            " mod_id TEXT NOT NULL, appid INTEGER NOT NULL, version TEXT NOT NULL,"
+            " installed_at TEXT NOT NULL, sha256 TEXT,"
+            " PRIMARY KEY (mod_id, appid))")
+        self.conn.commit()
+        self._batch_depth = 0
+        self._pending = 0
+
+    def migrate_installed_json(self, json_path):
+        """Import a legacy installed.json once, then rename it out of the way."""
+        if not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Could not migrate {json_path}: {e}")
+            return
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO installs (mod_id, appid, version, installed_at) VALUES (?, ?, ?, ?)",
+                [(mod_id, LEGACY_APPID, str(version), now) for mod_id, version in legacy.items()])
+        os.replace(json_path, json_path + ".migrated")
+        print(f"[INFO] Migrated {len(legacy)} installed mod(s) from {INSTALLED_MODS_FILE}.")
+
+    def get_version(self, mod_id, appid):
+        """Installed version of mod_id for appid, or None."""
+        row = self.conn.execute(
+            "SELECT version FROM installs WHERE mod_id = ? AND appid = ?", (mod_id, appid)).fetchone()
+        return row[0] if row else None
+
+    def installed_versions(self, mod_id):
+        """{appid: version} for every game mod_id is recorded against.
+
+        A legacy row only shows up while the mod has no per-game rows.
+        """
+        return dict(self.conn.execute(
+            "SELECT appid, version FROM installs WHERE mod_id = ? AND (appid != ? OR NOT EXISTS"
+            " (SELECT 1 FROM installs WHERE mod_id = ? AND appid != ?)) ORDER BY appid",
+            (mod_id, LEGACY_APPID, mod_id, LEGACY_APPID)))
+
+    def installed_mod_ids(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT mod_id FROM installs ORDER BY mod_id")]
+
+    def all_installs(self):
+        """[(mod_id, appid, version, installed_at)] ordered by mod and game."""
+        return self.conn.execute(
+            "SELECT mod_id, appid, version, installed_at FROM installs ORDER BY mod_id, appid").fetchall()
+
+    def record(self, mod_id, appid, version, sha256=None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO installs (mod_id, appid, version, installed_at, sha256)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (mod_id, appid, version, datetime.now().isoformat(timespec="seconds"), sha256))
+        if appid != LEGACY_APPID:
+            self.conn.execute("DELETE FROM installs WHERE mod_id = ? AND appid = ?", (mod_id, LEGACY_APPID))
+        self._pending += 1
+        if self._batch_depth == 0 or self._pending >= STATE_BATCH_SIZE:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.commit()
+
+def get_installed_store():
+    """Return the process-wide InstalledStore, migrating installed.json on first use."""
+    global _installed_store
+    quickfix_path = get_quickfix_dir()
+    db_path = os.path.join(quickfix_path, STATE_DB_FILE)
+    if _installed_store is None or _installed_store.path != db_path:
+        _installed_store = InstalledStore(db_path)
+        _installed_store.migrate_installed_json(os.path.join(quickfix_path, INSTALLED_MODS_FILE))
+    return _installed_store
+
+@traced("steam registry lookup")
 def get_steam_root():
+    global winreg
+    if STEAM_ROOT:
+        return STEAM_ROOT
+    if winreg is None:
+        try:
+            import winreg
+        except ImportError:  # not on Windows: libraries come from --steam-root / --steam-dir
+            debug_print("winreg unavailable; pass --steam-root or --steam-dir")
+            return None
     try:
         key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam")
         steam_path, _ = winreg.QueryValueEx(key, "SteamPath")
@@ -74,6 +631,7 @@ def get_steam_root():
         print(f"[WARN] Failed to read Steam path from registry: {e}")
         return None
 
+@traced("parse libraryfolders.vdf", lambda steam_root: {"steam_root": steam_root})
 def parse_libraryfolders(steam_root):
     libraries = []
     libraryfolders_path = os.path.join(steam_root, "steamapps", "libraryfolders.vdf")
@@ -98,49 +656,247 @@ def parse_libraryfolders(steam_root):
     libraries.append(os.path.join(steam_root, "steamapps"))
     return libraries
 
-def get_install_dir_from_manifest(manifest_path):
+def parse_app_manifest(manifest_path):
+    """Return {"installdir", "name", "state_flags"} from an appmanifest_<appid>.acf.
+
+    Missing keys come back as None; an unreadable manifest yields {}.
+    """
     try:
         with open(manifest_path, "r", encoding="utf-8") as f:
             content = f.read()
-        match = re.search(r'"installdir"\s+"([^"]+)"', content)
-        if match:
-            return match.group(1)
     except Exception as e:
         print(f"[WARN] Failed to parse manifest {manifest_path}: {e}")
-    return None
+        return {}
+    fields = {}
+    for key in ("installdir", "name"):
+        match = re.search(rf'"{key}"\s+"([^"]+)"', content)
+        fields[key] = match.group(1) if match else None
+    match = re.search(r'"StateFlags"\s+"(\d+)"', content)
+    fields["state_flags"] = int(match.group(1)) if match else None
+    return fields
+
+def _library_steamapps_path(path):
+    """Accept a library root (D:\\SteamLibrary) or its steamapps folder."""
+    if os.path.basename(os.path.normpath(path)).lower() == "steamapps":
+        return path
+    return os.path.join(path, "steamapps")
+
+@traced("scan Steam library", lambda library_path: {"library": library_path})
+def scan_steam_library(library_path):
+    """Return {appid: entry} for every installed app in one steamapps folder.
+
+    Each entry holds the game's install_path, its manifest path, the
+    library it was found in and the game's display name. Apps whose install folder is missing are skipped.
+    """
+    apps = {}
+    try:
+        names = os.listdir(library_path)
+    except OSError as e:
+        debug_print(f"Skipping unreadable Steam library {library_path}: {e}")
+        return apps
+
+    for name in names:
+        match = APPMANIFEST_RE.match(name)
+        if not match:
+            continue
+        manifest_path = os.path.join(library_path, name)
+        manifest = parse_app_manifest(manifest_path)
+        install_dir_name = manifest.get("installdir")
+        if not install_dir_name:
+            continue
+        full_path = os.path.join(library_path, "common", install_dir_name)
+        if os.path.isdir(full_path):
+            apps[int(match.group(1))] = {
+                "install_path": full_path,
+                "manifest": manifest_path,
+                "library": library_path,
+                "name": manifest.get("name"),
+            }
+    return apps
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
-def find_steam_game_install_path(appid):
+def _library_signature(library_path):
+    """Cheap change marker for a library: mtimes of steamapps and steamapps/common.
+
+    Steam adds, removes and rewrites appmanifests by renaming into steamapps,
+    and deleting a game folder touches common, so either mtime moving means
+    the library must be rescanned.
+    """
+    return [_mtime_ns(library_path), _mtime_ns(os.path.join(library_path, "common"))]
+
+def _unique_libraries(libraries):
+    """Drop repeated library paths, keeping the first spelling of each."""
+    seen = set()
+    unique_libraries = []
+    for library_path in libraries:
+        key = os.path.normcase(os.path.normpath(library_path))
+        if key not in seen:
+            seen.add(key)
+            unique_libraries.append(library_path)
+    return unique_libraries
+
+@traced("build Steam index")
+def build_steam_index(steam_root=None, library_paths=(), jobs=DEFAULT_JOBS, cache=None):
+    """Scan every Steam library once and return {appid: entry}.
+
+    Libraries come from steam_root's libraryfolders.vdf plus any explicit
+    library_paths. They are scanned concurrently (slow HDDs and network
+    drives dominate otherwise); when an appid appears in several libraries
+    the first library in that order wins.
+
+    When a cache dict (see load_steam_index_cache) is given, the library
+    list and per-library scans it holds are reused while the mtimes of
+    libraryfolders.vdf and each library still match, and the dict is
+    updated in place with anything that had to be rescanned.
+    """
+    if cache is None:
+        cache = {}
+    libraries = []
+    if steam_root:
+        vdf_mtime = _mtime_ns(os.path.join(steam_root, "steamapps", "libraryfolders.vdf"))
+        if (cache.get("steam_root") == steam_root and vdf_mtime is not None
+                and cache.get("libraryfolders_mtime") == vdf_mtime):
+            libraries.extend(cache["libraries"])
+        else:
+            root_libraries = parse_libraryfolders(steam_root)
+            cache.update(steam_root=steam_root, libraryfolders_mtime=vdf_mtime,
+                         libraries=root_libraries, dirty=True)
+            libraries.extend(root_libraries)
+    libraries.extend(_library_steamapps_path(p) for p in library_paths)
+
+    unique_libraries = _unique_libraries(libraries)
+    debug_print(f"Steam libraries to scan: {unique_libraries}")
+    if not unique_libraries:
+        return {}
+
+    cached_scans = cache.get("scans", {})
+    signatures = {lib: _library_signature(lib) for lib in unique_libraries}
+    stale = [lib for lib in unique_libraries
+             if cached_scans.get(lib, {}).get("signature") != signatures[lib]]
+    debug_print(f"{len(unique_libraries) - len(stale)} Steam libraries unchanged, {len(stale)} to scan")
+
+    scans = {}
+    if stale:
+        jobs = max(1, min(jobs, len(stale)))
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            scans = dict(zip(stale, pool.map(scan_steam_library, stale)))
+
+    index = {}
+    new_scans = {}
+    for library_path in unique_libraries:
+        if library_path in scans:
+            apps = scans[library_path]
+        else:
+            apps = {int(appid): entry for appid, entry in cached_scans[library_path]["apps"].items()}
+        new_scans[library_path] = {"signature": signatures[library_path], "apps": apps}
+        for appid, entry in apps.items():
+            index.setdefault(appid, entry)
+    cache["dirty"] = cache.get("dirty", False) or bool(stale) or new_scans.keys() != cached_scans.keys()
+    cache["scans"] = new_scans
+    debug_print(f"Indexed {len(index)} installed Steam apps")
+    return index
+
+def load_steam_index_cache():
+    """Return the persisted Steam index cache, or {} if missing or unusable."""
+    cache_path = os.path.join(get_quickfix_dir(), STEAM_INDEX_CACHE_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != STEAM_INDEX_CACHE_VERSION:
+        return {}
+    return cache
+
+def save_steam_index_cache(cache):
+    cache_path = os.path.join(get_quickfix_dir(), STEAM_INDEX_CACHE_FILE)
+    data = {k: v for k, v in cache.items() if k != "dirty"}
+    data["version"] = STEAM_INDEX_CACHE_VERSION
+    try:
+        _write_json_atomic(cache_path, data, ensure_ascii=False)
+    except OSError as e:
+        print(f"[WARN] Failed to save Steam index cache: {e}")
+
+def get_steam_index():
+    """Return the process-wide Steam library index, building it on first use."""
+    global _steam_index
+    with _steam_index_lock:
+        if _steam_index is None:
+            steam_root = get_steam_root()
+            if not steam_root or not os.path.isdir(steam_root):
+                steam_root = None
+                if not EXTRA_STEAM_LIBRARIES:
+                    print("[ERROR] Steam root directory not found.")
+            cache = load_steam_index_cache() if USE_STEAM_INDEX_CACHE else {}
+            _steam_index = build_steam_index(steam_root, EXTRA_STEAM_LIBRARIES, cache=cache)
+            if cache.get("dirty"):
+                save_steam_index_cache(cache)
+                remember_game_names(_steam_index)
+        return _steam_index
+
+def reset_steam_index():
+    """Forget the in-process Steam index; the next use rescans changed libraries."""
+    global _steam_index
+    with _steam_index_lock:
+        _steam_index = None
+
+def get_steam_libraries():
+    """Return the existing steamapps folders that get_steam_index() scans."""
     steam_root = get_steam_root()
-    if not steam_root or not os.path.isdir(steam_root):
-        print("[ERROR] Steam root directory not found.")
-        return None
+    libraries = parse_libraryfolders(steam_root) if steam_root and os.path.isdir(steam_root) else []
+    libraries.extend(_library_steamapps_path(p) for p in EXTRA_STEAM_LIBRARIES)
+    return [lib for lib in _unique_libraries(libraries) if os.path.isdir(lib)]
 
-    library_paths = parse_libraryfolders(steam_root)
-    debug_print(f"Steam libraries to scan: {library_paths}")
-
-    for library_path in library_paths:
-        appmanifest_path = os.path.join(library_path, f"appmanifest_{appid}.acf")
-        if os.path.exists(appmanifest_path):
-            install_dir_name = get_install_dir_from_manifest(appmanifest_path)
-            if install_dir_name:
-                full_path = os.path.join(library_path, "common", install_dir_name)
-                debug_print(f"Checking for game install path: {full_path}")
-                if os.path.exists(full_path):
-                    return full_path
+def find_steam_game_install_path(appid):
+    entry = get_steam_index().get(int(appid))
+    if entry:
+        debug_print(f"Found install path for {appid}: {entry['install_path']}")
+        return entry["install_path"]
     return None
 
-def get_steam_game_name(appid):
-    url = f"https://store.steampowered.com/api/appdetails?appids={appid}&cc=us&l=en"
+def load_game_names():
+    """Return the persisted {appid: name} map, loading it once per process."""
+    global _game_names
+    if _game_names is None:
+        names_path = os.path.join(get_quickfix_dir(), GAME_NAMES_FILE)
+        try:
+            with open(names_path, "r", encoding="utf-8") as f:
+                _game_names = {int(appid): name for appid, name in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            _game_names = {}
+    return _game_names
+
+def remember_game_names(index):
+    """Persist manifest names from a fresh scan so they outlive uninstalls."""
+    names = load_game_names()
+    new_names = {appid: entry["name"] for appid, entry in index.items()
+                 if entry.get("name") and names.get(appid) != entry["name"]}
+    if not new_names:
+        return
+    names.update(new_names)
+    names_path = os.path.join(get_quickfix_dir(), GAME_NAMES_FILE)
     try:
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        if data[str(appid)]["success"]:
-            return data[str(appid)]["data"]["name"]
-    except Exception:
-        pass
-    return f"Steam App {appid}"
+        _write_json_atomic(names_path, names, indent=2, ensure_ascii=False)
+    except OSError as e:
+        print(f"[WARN] Failed to save game names: {e}")
+
+def get_steam_game_name(appid):
+    """Display name from the game's appmanifest, then the name cache.
+
+    Purely local: names are only used for log output, so an unknown appid
+    falls back to a placeholder rather than a Steam store request.
+    """
+    entry = get_steam_index().get(int(appid))
+    if entry and entry.get("name"):
+        return entry["name"]
+    return load_game_names().get(int(appid), f"Steam App {appid}")
 
-def install_mod(mod_id, mods, force=False):
+def install_mod(mod_id, mods, force=False, release=None):
     mod = mods.get(mod_id)
     if not mod:
         print(f"[ERROR] Mod ID {mod_id} not found.")
@@ -154,49 +910,461 @@ def install_mod(mod_id, mods, force=False):
         print(f"[WARN] No games defined for mod {mod_id}.")
         return
 
-    version, download_url = get_latest_release_info(repo)
+    # Bulk commands pass the (version, download_url) they already resolved.
+    version, download_url = release or get_release_info(mod)
     if not version or not download_url:
         print(f"[ERROR] Could not retrieve latest release for {mod_id}.")
         return
 
-    installed_mods = load_installed_mods()
+    store = get_installed_store()
+    sha256, size = get_pinned_asset(mod, download_url)
+    zip_path = None
 
-    for game in games:
+    for appid, game_name, install_path in plan_install(mod_id, mod, version, store, force=force):
+        print(f"[INFO] Installing {mod_id} for {game_name} ({version})...")
+        try:
+            # Fetched at most once per mod; multi-game mods reuse the cached zip.
+            if zip_path is None:
+                zip_path = fetch_mod_zip(download_url, sha256=sha256, size=size)
+                archive_sha256 = sha256 or _hash_file_mmap(zip_path)
+            apply_install(mod, mod_id, appid, version, install_path, zip_path, download_url)
+            store.record(mod_id, appid, version, archive_sha256)
+            print(f"[INFO] Installation complete for {game_name}!")
+        except DownloadError as e:
+            # Every game gets the same asset, so there is no point retrying it.
+            print(f"[ERROR] {mod_id}: {e}")
+            return
+
+def plan_install(mod_id, mod, version, store, force=False, log=print):
+    """Return [(appid, game_name, install_path)] for the games that need `version`.
+
+    Games that are not installed or already up to date are logged and left out.
+    """
+    targets = []
+    for game in mod.get("games", []):
         appid = game["steam_appid"]
         game_name = get_steam_game_name(appid)
         install_path = find_steam_game_install_path(appid)
 
         if not install_path:
-            print(f"[WARN] Could not find install path for {game_name}")
+            log(f"[WARN] Could not find install path for {game_name}")
             continue
 
         # Check if the mod is installed and if the version needs an update
-        if mod_id in installed_mods:
-            installed_version = installed_mods[mod_id]
-            if installed_version == version and not force:
-                print(f"[INFO] Mod {mod_id} is already up to date for {game_name}. Skipping.")
-                continue
+        if store.get_version(mod_id, appid) == version and not force:
+            log(f"[INFO] Mod {mod_id} is already up to date for {game_name}. Skipping.")
+            continue
+        targets.append((appid, game_name, install_path))
+    return targets
 
-        print(f"[INFO] Installing {mod_id} for {game_name} ({version})...")
-        try:
-            zip_path = download_mod_zip(download_url)
-            extract_zip(zip_path, install_path)
-            installed_mods[mod_id] = version  # Update version in installed mods
-            save_installed_mods(installed_mods)  # Save the updated installed mods info
-            print(f"[INFO] Installation complete for {game_name}!")
-        finally:
-            if os.path.exists(zip_path):
-                os.remove(zip_path)
+@traced("extract", lambda mod, mod_id, appid, *args: {"mod_id": mod_id, "appid": appid})
+def apply_install(mod, mod_id, appid, version, install_path, zip_path, download_url, log=print):
+    """Extract zip_path into install_path and write the install manifest (blocking)."""
+    manifest = load_install_manifest(mod_id, appid) or {}
+    records = extract_zip(zip_path, install_path, previous=manifest.get("files"), log=log)
+    record_install(mod, mod_id, appid, version, install_path, zip_path, download_url, records)
 
-def install_all_mods(mods):
+class InstallJob:
+    """One mod moving through the install pipeline.
+
+    Stages work on many jobs at once, so each job buffers its output in
+    `lines` and the pipeline prints finished jobs in catalog order.
+    """
+
+    def __init__(self, index, mod_id, mod, update=False):
+        self.index = index
+        self.mod_id = mod_id
+        self.mod = mod
+        self.update = update
+        self.version = None
+        self.download_url = None
+        self.targets = []
+        self.zip_path = None
+        self.sha256 = None
+        self.downloaded = 0
+        self.deferred = None
+        self.failed = False
+        self.lines = []
+
+    def log(self, message):
+        self.lines.append(message)
+
+class _OrderedOutput:
+    """Reorder buffer: prints a job's output once every earlier job has finished."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.finished = set()
+        self.next = 0
+
+    def finish(self, job):
+        self.finished.add(job.index)
+        while self.next in self.finished:
+            for line in self.jobs[self.next].lines:
+                print(line)
+            self.next += 1
+
+async def _run_stage(inbox, outbox, workers, handle, finish):
+    """Run `workers` copies of handle over inbox until each gets a None sentinel.
+
+    Jobs that handle() accepts move on to outbox; the rest (and every job
+    leaving the last stage) are finished.
+    """
+    import asyncio
+
+    async def worker():
+        while (job := await inbox.get()) is not None:
+            try:
+                advance = await handle(job)
+            except Exception as e:
+                job.log(f"[ERROR] {job.mod_id}: {e}")
+                job.failed = True
+                advance = False
+            if advance and outbox is not None:
+                await outbox.put(job)
+            else:
+                finish(job)
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+async def _install_pipeline(install_jobs, jobs, download_jobs, extract_jobs):
+    """Stream install_jobs through resolve -> download -> verify -> extract.
+
+    Each stage has its own worker count and a bounded queue in front of it,
+    so release lookups, downloads and disk work overlap and a slow stage
+    applies back-pressure instead of buffering the whole catalog. Blocking
+    work runs on per-stage thread pools; installed state is only written
+    from the event loop thread.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    store = get_installed_store()
+    # Build the Steam index up front so planning on the loop never scans.
+    await loop.run_in_executor(None, get_steam_index)
+    resolve_pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="resolve")
+    download_pool = ThreadPoolExecutor(max_workers=download_jobs, thread_name_prefix="download")
+    disk_pool = ThreadPoolExecutor(max_workers=extract_jobs, thread_name_prefix="disk")
+
+    async def resolve(job):
+        if job.mod is None:
+            job.log(f"[ERROR] Mod ID {job.mod_id} not found in available mods.")
+            return False
+        if not job.mod.get("games"):
+            job.log(f"[WARN] No games defined for mod {job.mod_id}.")
+            return False
+        release = get_pinned_release(job.mod)
+        if release:
+            version, download_url = release
+        else:
+            try:
+                version, download_url, error = await loop.run_in_executor(
+                    resolve_pool, fetch_latest_release, job.mod["repo"])
+            except RateLimitDeferred as e:
+                job.deferred = e
+                return False
+            except Exception as e:
+                version, download_url, error = None, None, f"Release lookup failed for {job.mod_id}: {e}"
+            if error:
+                job.log(f"[ERROR] {error}")
+                job.failed = True
+                return False
+        job.version, job.download_url = version, download_url
+
+        force = False
+        if job.update:
+            installed = store.installed_versions(job.mod_id)
+            outdated = sorted({v for v in installed.values() if v != version})
+            if not outdated:
+                job.log(f"[INFO] Mod {job.mod_id} is already up to date (version {version}). Skipping update.")
+                return False
+            job.log(f"[INFO] Updating mod {job.mod_id} from version {', '.join(outdated)} to {version}...")
+            force = True
+        job.targets = plan_install(job.mod_id, job.mod, version, store, force=force, log=job.log)
+        return bool(job.targets)
+
+    async def download(job):
+        sha256, size = get_pinned_asset(job.mod, job.download_url)
+        cached = os.path.isfile(download_cache_path(job.download_url, sha256))
+        start = time.monotonic()
+        try:
+            job.zip_path = await loop.run_in_executor(
+                download_pool, _in_span, "fetch zip", {"mod_id": job.mod_id},
+                fetch_mod_zip, job.download_url, sha256, size, job.log, False)
+        except DownloadError as e:
+            job.log(f"[ERROR] {job.mod_id}: {e}")
+            job.failed = True
+            return False
+        if not cached:
+            job.downloaded = os.path.getsize(job.zip_path)
+            job.log(f"[INFO] Downloaded {job.mod_id}: "
+                    f"{_format_throughput(job.downloaded, time.monotonic() - start)}")
+        job.sha256 = sha256
+        return True
+
+    async def verify(job):
+        # fetch_mod_zip already checked pinned archives (in flight or on a
+        # cache hit); unpinned ones are hashed here for the state record.
+        if job.sha256:
+            return True
+        job.sha256 = await loop.run_in_executor(disk_pool, _in_span, "hash archive", {"mod_id": job.mod_id},
+                                                _hash_file_mmap, job.zip_path)
+        return True
+
+    async def extract(job):
+        for appid, game_name, install_path in job.targets:
+            job.log(f"[INFO] Installing {job.mod_id} for {game_name} ({job.version})...")
+            await loop.run_in_executor(disk_pool, apply_install, job.mod, job.mod_id, appid,
+                                       job.version, install_path, job.zip_path, job.download_url,
+                                       job.log)
+            store.record(job.mod_id, appid, job.version, job.sha256)
+            job.log(f"[INFO] Installation complete for {game_name}!")
+        return True
+
+    stages = [(resolve, jobs), (download, download_jobs), (verify, extract_jobs), (extract, extract_jobs)]
+    queues = [asyncio.Queue(maxsize=2 * workers) for _, workers in stages]
+    output = _OrderedOutput(install_jobs)
+
+    async def feed():
+        for job in install_jobs:
+            await queues[0].put(job)
+        for _ in range(stages[0][1]):
+            await queues[0].put(None)
+
+    async def run(i):
+        handle, workers = stages[i]
+        outbox = queues[i + 1] if i + 1 < len(stages) else None
+        await _run_stage(queues[i], outbox, workers, handle, output.finish)
+        if outbox is not None:
+            for _ in range(stages[i + 1][1]):
+                await outbox.put(None)
+
+    start = time.monotonic()
+    try:
+        with store.batch():
+            await asyncio.gather(feed(), *(run(i) for i in range(len(stages))))
+    finally:
+        for pool in (resolve_pool, download_pool, disk_pool):
+            pool.shutdown(wait=False)
+        save_release_cache()
+    wall = time.monotonic() - start
+    prune_download_cache(DOWNLOAD_CACHE_MAX_BYTES)
+
+    total = sum(job.downloaded for job in install_jobs)
+    if total:
+        print(f"[INFO] Downloaded {_format_throughput(total, wall)} in total.")
+    deferred = [job.deferred for job in install_jobs if job.deferred]
+    if deferred:
+        report_deferred_lookups(deferred, failed=sum(job.failed for job in install_jobs))
+
+def _in_span(name, args, func, *func_args):
+    """Call func inside a trace span; lets executor jobs carry mod_id/appid."""
+    with trace_span(name, **args):
+        return func(*func_args)
+
+def run_install_pipeline(mod_ids, mods, update=False, jobs=DEFAULT_JOBS,
+                         download_jobs=DEFAULT_DOWNLOAD_JOBS, extract_jobs=DEFAULT_EXTRACT_JOBS):
+    """Install (or with update=True, update) mod_ids through the staged pipeline."""
+    import asyncio
+    install_jobs = [InstallJob(i, mod_id, mods.get(mod_id), update) for i, mod_id in enumerate(mod_ids)]
+    asyncio.run(_install_pipeline(install_jobs, jobs, download_jobs, extract_jobs))
+
+def _format_throughput(size, elapsed):
+    rate = size / elapsed if elapsed > 0 else 0
+    return f"{size / 1048576:.2f} MB in {elapsed:.2f} s ({rate / 1048576:.2f} MB/s)"
+
+def install_all_mods(mods, jobs=DEFAULT_JOBS, download_jobs=DEFAULT_DOWNLOAD_JOBS,
+                     extract_jobs=DEFAULT_EXTRACT_JOBS):
     print("[INFO] Scanning all available mods for installed games...")
-    for mod_id in mods.keys():
-        install_mod(mod_id, mods, force=False)
+    installed_appids = set(get_steam_index())
+    matched = match_installed_mods(mods, installed_appids)
+    print(f"[INFO] {len(matched)} of {len(mods)} mods match your {len(installed_appids)} installed game(s).")
+    run_install_pipeline(matched, mods, jobs=jobs, download_jobs=download_jobs, extract_jobs=extract_jobs)
+
+def build_appid_index(mods):
+    """Return {appid: [mod_id, ...]} with each list in catalog order."""
+    index = {}
+    for mod_id, mod in mods.items():
+        for game in mod.get("games", []):
+            index.setdefault(int(game["steam_appid"]), []).append(mod_id)
+    return index
+
+def _appid_index_from_json(by_appid):
+    """JSON object keys are strings; turn them back into int appids."""
+    return {int(appid): mod_ids for appid, mod_ids in by_appid.items()}
+
+def catalog_appid_index(mods):
+    """Return mods' appid index, reusing the precomputed one for the loaded catalog."""
+    cached = _catalog_appid_index
+    if cached is not None and cached[0] is mods:
+        return cached[1]
+    return build_appid_index(mods)
+
+def match_installed_mods(mods, installed_appids):
+    """Return the mod_ids (in catalog order) with at least one installed game.
+
+    Intersects the catalog's appid index with the installed appids, so bulk
+    installs only resolve releases for mods that can actually be installed.
+    """
+    index = catalog_appid_index(mods)
+    matched = {mod_id for appid in installed_appids for mod_id in index.get(appid, ())}
+    return [mod_id for mod_id in mods if mod_id in matched]
+
+class ManifestWatcher:
+    """Tracks the appmanifests of some steamapps folders between scans.
+
+    The first scan of each library only records what is there; later scans
+    re-read the manifests whose mtime changed and report the appids that
+    have become fully installed since.
+    """
+
+    def __init__(self, libraries):
+        self.libraries = list(libraries)
+        self._dir_mtimes = {}
+        self._manifests = {}  # manifest path -> (mtime_ns, appid, fully installed)
+        for library_path in self.libraries:
+            self.scan(library_path)
+
+    def scan(self, library_path):
+        """Re-read library_path's changed manifests; return the newly installed appids."""
+        self._dir_mtimes[library_path] = _mtime_ns(library_path)
+        try:
+            names = os.listdir(library_path)
+        except OSError as e:
+            debug_print(f"Skipping unreadable Steam library {library_path}: {e}")
+            names = []
+
+        installed = []
+        present = set()
+        for name in names:
+            match = APPMANIFEST_RE.match(name)
+            if not match:
+                continue
+            manifest_path = os.path.join(library_path, name)
+            present.add(manifest_path)
+            mtime = _mtime_ns(manifest_path)
+            previous = self._manifests.get(manifest_path)
+            if previous and previous[0] == mtime:
+                continue
+            appid = int(match.group(1))
+            ready = parse_app_manifest(manifest_path).get("state_flags") == STEAM_STATE_FULLY_INSTALLED
+            self._manifests[manifest_path] = (mtime, appid, ready)
+            if ready and not (previous and previous[2]):
+                installed.append(appid)
+        # Uninstalled games drop out, so installing them again is noticed.
+        for manifest_path in [p for p in self._manifests
+                              if os.path.dirname(p) == library_path and p not in present]:
+            del self._manifests[manifest_path]
+        return installed
+
+    def poll(self):
+        """Scan only the libraries whose directory mtime moved; return new appids.
+
+        Steam writes appmanifests by renaming into steamapps, which always
+        bumps the folder's mtime, so unchanged libraries cost one stat.
+        """
+        installed = []
+        for library_path in self.libraries:
+            if _mtime_ns(library_path) != self._dir_mtimes.get(library_path):
+                installed.extend(self.scan(library_path))
+        return installed
+
+def _start_native_watch(libraries, pending, lock, wake):
+    """Watch libraries with watchdog; returns the observer, or None to poll instead."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        debug_print("watchdog not installed; polling Steam libraries")
+        return None
+
+    class ManifestEvents(FileSystemEventHandler):
+        def __init__(self, library_path):
+            self.library_path = library_path
+
+        def on_any_event(self, event):
+            paths = (event.src_path, getattr(event, "dest_path", "") or "")
+            if any(APPMANIFEST_RE.search(os.fsdecode(p)) for p in paths):
+                with lock:
+                    pending.add(self.library_path)
+                wake.set()
+
+    observer = Observer()
+    try:
+        for library_path in libraries:
+            observer.schedule(ManifestEvents(library_path), library_path, recursive=False)
+        observer.start()
+    except OSError as e:
+        debug_print(f"Native file watching unavailable ({e}); polling Steam libraries")
+        return None
+    return observer
+
+def watch_libraries(libraries, on_installed, interval=WATCH_POLL_INTERVAL, stop=None, native=True):
+    """Call on_installed([appid, ...]) whenever games finish installing, until stop is set.
+
+    Uses native filesystem notifications through watchdog when it is
+    installed, and otherwise polls each library's directory mtime.
+    """
+    stop = stop or threading.Event()
+    watcher = ManifestWatcher(libraries)
+    pending = set()
+    lock = threading.Lock()
+    wake = threading.Event()
+    observer = _start_native_watch(watcher.libraries, pending, lock, wake) if native else None
+    debug_print(f"Watching {len(watcher.libraries)} Steam libraries "
+                f"({'native events' if observer else f'polling every {interval} s'})")
+    try:
+        while not stop.is_set():
+            if observer is None:
+                stop.wait(interval)
+                installed = watcher.poll()
+            else:
+                if not wake.wait(1.0):
+                    continue
+                stop.wait(WATCH_SETTLE)
+                wake.clear()
+                with lock:
+                    changed = list(pending)
+                    pending.clear()
+                installed = [appid for library_path in changed for appid in watcher.scan(library_path)]
+            if installed:
+                on_installed(installed)
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+def watch_command(mods, offline=False, interval=WATCH_POLL_INTERVAL, jobs=DEFAULT_JOBS,
+                  download_jobs=DEFAULT_DOWNLOAD_JOBS, extract_jobs=DEFAULT_EXTRACT_JOBS):
+    """Install the matching fixes for each game as soon as Steam finishes installing it."""
+    libraries = get_steam_libraries()
+    if not libraries:
+        print("[ERROR] No Steam libraries found to watch.")
+        return
+
+    def install_for(appids):
+        nonlocal mods
+        reset_steam_index()
+        names = {appid: (get_steam_index().get(appid) or {}).get("name") or f"Steam App {appid}"
+                 for appid in appids}
+        print(f"[INFO] Finished installing: {', '.join(names.values())}.")
+        if not offline:
+            mods = revalidate_catalog(mods, quiet=True)
+        matched = match_installed_mods(mods, set(appids))
+        if not matched:
+            print("[INFO] No fixes in the catalog for these games.")
+            return
+        run_install_pipeline(matched, mods, jobs=jobs, download_jobs=download_jobs,
+                             extract_jobs=extract_jobs)
+
+    print(f"[INFO] Watching {len(libraries)} Steam library folder(s) for new games. Press Ctrl+C to stop.")
+    try:
+        watch_libraries(libraries, install_for, interval=interval)
+    except KeyboardInterrupt:
+        print("[INFO] Stopped watching.")
 
-def update_mod(mod_id, mods):
+def update_mod(mod_id, mods, release=None):
     """Update a specific mod."""
-    installed_mods = load_installed_mods()
-    if mod_id not in installed_mods:
+    installed_versions = get_installed_store().installed_versions(mod_id)
+    if not installed_versions:
         print(f"[ERROR] Mod ID {mod_id} is not installed.")
         return
 
@@ -205,71 +1373,728 @@ def update_mod(mod_id, mods):
         print(f"[ERROR] Mod ID {mod_id} not found in available mods.")
         return
 
-    repo = mod["repo"]
-    latest_version, _ = get_latest_release_info(repo)
+    release = release or get_release_info(mod)
+    latest_version, _ = release
 
     if not latest_version:
         print(f"[ERROR] Could not retrieve the latest version for mod {mod_id}.")
         return
 
-    installed_version = installed_mods[mod_id]
-    if installed_version == latest_version:
-        print(f"[INFO] Mod {mod_id} is already up to date (version {installed_version}). Skipping update.")
+    outdated_versions = sorted({v for v in installed_versions.values() if v != latest_version})
+    if not outdated_versions:
+        print(f"[INFO] Mod {mod_id} is already up to date (version {latest_version}). Skipping update.")
         return
+    installed_version = ", ".join(outdated_versions)
 
     print(f"[INFO] Updating mod {mod_id} from version {installed_version} to {latest_version}...")
-    install_mod(mod_id, mods, force=True)
+    install_mod(mod_id, mods, force=True, release=release)
 
-def update_all_mods(mods):
+def update_all_mods(mods, jobs=DEFAULT_JOBS, download_jobs=DEFAULT_DOWNLOAD_JOBS,
+                    extract_jobs=DEFAULT_EXTRACT_JOBS):
     """Update all installed mods."""
-    installed_mods = load_installed_mods()
-    if not installed_mods:
+    store = get_installed_store()
+    installed_mod_ids = store.installed_mod_ids()
+    if not installed_mod_ids:
         print("[INFO] No mods are currently installed.")
         return
 
     print("[INFO] Updating all installed mods...")
-    for mod_id in installed_mods.keys():
-        update_mod(mod_id, mods)
+    run_install_pipeline(installed_mod_ids, mods, update=True, jobs=jobs,
+                         download_jobs=download_jobs, extract_jobs=extract_jobs)
 
 def update_cache():
     print("[INFO] Fetching latest mods.json from GitHub and updating local cache...")
-    mods_json = fetch_latest_mods_json()
-    save_local_mods_json(mods_json)
+    artifact = fetch_catalog_artifact()
+    if artifact is not None:
+        save_catalog_artifact(*artifact)
+    else:
+        index = fetch_catalog_index()
+        mods_json, etag = fetch_latest_mods_json()
+        save_local_mods_json(mods_json, etag, revision=catalog_revision(mods_json, index))
     print("[INFO] Cache updated successfully.")
 
-def save_local_mods_json(mods):
-    # Get the AppData path and define the folder for QuickFix
-    appdata_path = os.getenv("APPDATA")
-    quickfix_path = os.path.join(appdata_path, "QuickFix")
+def save_catalog_artifact(envelope, artifact_etag):
+    """Cache a downloaded catalog artifact, keeping its precomputed appid index."""
+    save_local_mods_json(envelope["mods"], revision=envelope.get("revision"),
+                         by_appid=_appid_index_from_json(envelope["by_appid"]),
+                         artifact_etag=artifact_etag)
+    return envelope["mods"]
+
+def save_local_mods_json(mods, etag=None, revision=None, by_appid=None, artifact_etag=None):
+    """Cache mods with its appid index (built here unless given) and record the meta."""
+    global _catalog_appid_index
+    quickfix_path = get_quickfix_dir()
 
     # Create the QuickFix directory if it doesn't exist
     if not os.path.exists(quickfix_path):
         os.makedirs(quickfix_path)
 
-    LOCAL_MODS_JSON = os.path.join(quickfix_path, "mods.json")
+    if by_appid is None:
+        by_appid = build_appid_index(mods)
+    local_catalog = os.path.join(quickfix_path, LOCAL_CATALOG_FILE)
+
+    _write_json_atomic(local_catalog, {"schema": CATALOG_SCHEMA, "by_appid": by_appid, "mods": mods},
+                       separators=(",", ":"), ensure_ascii=False)
+    _catalog_appid_index = (mods, by_appid)
+    try:
+        os.remove(os.path.join(quickfix_path, LOCAL_MODS_JSON_FILE))
+    except FileNotFoundError:
+        pass
+    save_catalog_meta({"etag": etag, "artifact_etag": artifact_etag,
+                       "fetched_at": time.time(), "revision": revision})
 
-    with open(LOCAL_MODS_JSON, "w", encoding="utf-8") as f:
-        json.dump(mods, f, indent=2, ensure_ascii=False)
+def load_local_mods_json():
+    """Return the cached catalog, or None if there is no usable cache."""
+    global _catalog_appid_index
+    quickfix_path = get_quickfix_dir()
+    try:
+        with open(os.path.join(quickfix_path, LOCAL_CATALOG_FILE), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("schema") == CATALOG_SCHEMA:
+            mods = cached["mods"]
+            _catalog_appid_index = (mods, _appid_index_from_json(cached["by_appid"]))
+            return mods
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    try:
+        with open(os.path.join(quickfix_path, LOCAL_MODS_JSON_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
-def download_mod_zip(download_url):
-    print(f"[INFO] Downloading mod from {download_url}...")
-    response = requests.get(download_url, stream=True, timeout=30)
-    response.raise_for_status()
+def load_catalog_meta():
+    meta_path = os.path.join(get_quickfix_dir(), CATALOG_META_FILE)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_catalog_meta(meta):
+    _write_json_atomic(os.path.join(get_quickfix_dir(), CATALOG_META_FILE), meta, indent=2)
 
-    temp_fd, temp_path = tempfile.mkstemp(suffix=".zip")
-    os.close(temp_fd)
+def revalidate_catalog(cached_mods, quiet=False):
+    """Revalidate the cached catalog against GitHub and return the current one.
+
+    With a cached revision, the feed index is checked first: an unchanged
+    revision keeps the cache, and a small gap is closed by applying the
+    published deltas. Otherwise the full catalog is fetched with
+    If-None-Match, as the compressed artifact when one is published and as
+    mods.json if not, and the cache kept on a 304. When GitHub is
+    unreachable the cached catalog is served instead; without a cache the
+    error propagates.
+    """
+    import requests
+    meta = load_catalog_meta() if cached_mods is not None else {}
+    if not quiet:
+        print("[INFO] Fetching latest mods.json from GitHub...")
+    try:
+        index = fetch_catalog_index()
+        revision = meta.get("revision")
+        if index and revision is not None:
+            if index["revision"] == revision:
+                debug_print(f"Catalog still at revision {revision}; using cached copy")
+                save_catalog_meta({**meta, "fetched_at": time.time()})
+                return cached_mods
+            mods = apply_catalog_deltas(cached_mods, revision, index)
+            if mods is not None:
+                debug_print(f"Catalog updated from revision {revision} to {index['revision']} with deltas")
+                save_local_mods_json(mods, revision=index["revision"])
+                return mods
+        artifact = fetch_catalog_artifact(meta.get("artifact_etag"))
+        if artifact is None:
+            mods, etag = fetch_latest_mods_json(meta.get("etag"))
+        elif artifact[0] is not None:
+            return save_catalog_artifact(*artifact)
+        else:
+            mods = None
+    except (requests.RequestException, RateLimitDeferred, OSError, ValueError, KeyError) as e:
+        if cached_mods is None:
+            raise
+        print(f"[WARN] Could not refresh mods.json ({e}); using cached copy.")
+        return cached_mods
+
+    if mods is None:
+        debug_print("mods.json not modified since last fetch; using cached copy")
+        save_catalog_meta({**meta, "fetched_at": time.time(),
+                           "revision": catalog_revision(cached_mods, index)})
+        return cached_mods
+    save_local_mods_json(mods, etag, revision=catalog_revision(mods, index))
+    return mods
+
+@traced("load catalog")
+def load_catalog(offline=False, background=False):
+    """Return the mod catalog, preferring the local cache.
+
+    offline: never touch the network; fails only if there is no cache.
+    background: serve the cache immediately and revalidate it on a thread
+    (stale-while-revalidate), so the refresh benefits the next run.
+    Otherwise the cache is revalidated before returning.
+    """
+    cached_mods = load_local_mods_json()
+    if offline:
+        if cached_mods is None:
+            print("[ERROR] No cached mods.json available; run once without --offline.")
+        return cached_mods
+    if cached_mods is not None and background:
+        # Non-daemon, so the interpreter lets the refresh finish before exit.
+        threading.Thread(target=revalidate_catalog, args=(cached_mods, True),
+                         name="catalog-refresh").start()
+        return cached_mods
+    return revalidate_catalog(cached_mods)
+
+def get_pinned_asset(mod, download_url):
+    """Return the catalog's (sha256, size) for download_url, or (None, None).
+
+    The pinned hash only describes the catalog's own download_url; a live
+    release URL (--live) is downloaded unverified.
+    """
+    if download_url and download_url == mod.get("download_url"):
+        return mod.get("sha256"), mod.get("size")
+    return None, None
 
-    with open(temp_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
+def _load_partial_validator(validator_path, download_url):
+    try:
+        with open(validator_path, "r", encoding="utf-8") as f:
+            validator = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return validator if validator.get("url") == download_url else {}
 
-    debug_print(f"Downloaded mod zip to: {temp_path}")
-    return temp_path
+def _resume_offset(partial_path, validator, sha256, size):
+    """Bytes of partial_path worth resuming from, or 0 to start over.
 
-def extract_zip(zip_path, extract_to):
-    print(f"[INFO] Extracting mod zip to {extract_to}...")
+    Resuming needs something to catch a changed upstream file: an ETag or
+    Last-Modified for If-Range, or a catalog sha256 to check at the end.
+    """
+    try:
+        offset = os.path.getsize(partial_path)
+    except OSError:
+        return 0
+    if size and offset >= size:
+        return 0
+    if not (validator.get("etag") or validator.get("last_modified") or sha256):
+        return 0
+    return offset
+
+@traced("download", lambda download_url, dest_path, sha256=None, size=None, log=print: {"url": download_url})
+def download_mod_zip(download_url, dest_path, sha256=None, size=None, log=print):
+    """Download download_url to dest_path and return dest_path.
+
+    Bytes land in dest_path + ".part" first. If an earlier attempt left a
+    partial file there, the download resumes with a Range request guarded
+    by If-Range; it restarts from zero only when the server ignores or
+    rejects (416) the range or the content changed (different validator,
+    or a sha256 mismatch after resuming). A dropped connection keeps the partial file
+    for the next run.
+
+    The SHA-256 and byte count are computed as chunks arrive. With a known
+    size the download aborts as soon as Content-Length or the running total
+    exceeds it; with a known sha256 a mismatch is rejected before anything
+    is extracted. Raises DownloadError on rejection or a dropped transfer.
+    Progress goes to log, so pipeline workers can buffer it per job.
+    """
+    log(f"[INFO] Downloading mod from {download_url}...")
+    partial_path = dest_path + PARTIAL_SUFFIX
+    validator_path = partial_path + ".json"
+
+    for allow_resume in (True, False):
+        validator = _load_partial_validator(validator_path, download_url) if allow_resume else {}
+        offset = _resume_offset(partial_path, validator, sha256, size) if allow_resume else 0
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if validator.get("etag") or validator.get("last_modified"):
+                headers["If-Range"] = validator.get("etag") or validator["last_modified"]
+
+        response = http_get(download_url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT)
+        if offset and response.status_code == 416:
+            # The partial file already holds every byte (or more); without a
+            # size to trust it, fetch the whole file again.
+            response.close()
+            _remove_partial(partial_path)
+            debug_print(f"Server rejected resuming {download_url} at byte {offset}; restarting")
+            continue
+        response.raise_for_status()
+        if offset and not (response.status_code == 206 and
+                           response.headers.get("Content-Range", "").startswith(f"bytes {offset}-")):
+            debug_print(f"Server did not resume {download_url} at byte {offset}; restarting")
+            offset = 0
+
+        content_length = response.headers.get("Content-Length", "")
+        if size and content_length.isdigit() and offset + int(content_length) > size:
+            response.close()
+            _remove_partial(partial_path)
+            raise DownloadError(f"{download_url} is {offset + int(content_length)} bytes, expected {size}")
+
+        hasher = hashlib.sha256()
+        if offset:
+            debug_print(f"Resuming {download_url} at byte {offset}")
+            with open(partial_path, "rb") as f:
+                for block in iter(lambda: f.read(DOWNLOAD_MAX_CHUNK), b""):
+                    hasher.update(block)
+        else:
+            with open(validator_path, "w", encoding="utf-8") as f:
+                json.dump({"url": download_url, "etag": response.headers.get("ETag"),
+                           "last_modified": response.headers.get("Last-Modified")}, f)
+
+        received = offset
+        chunk_size = DOWNLOAD_MIN_CHUNK
+        try:
+            with open(partial_path, "ab" if offset else "wb") as f:
+                while True:
+                    chunk = response.raw.read(chunk_size, decode_content=True)
+                    if not chunk:
+                        break
+                    received += len(chunk)
+                    if size and received > size:
+                        raise DownloadError(f"{download_url} exceeded the expected {size} bytes")
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    if _download_rate_limiter:
+                        _download_rate_limiter.consume(len(chunk))
+                    if len(chunk) == chunk_size:
+                        chunk_size = min(chunk_size * 2, DOWNLOAD_MAX_CHUNK)
+        except DownloadError:
+            response.close()
+            _remove_partial(partial_path)
+            raise
+        except Exception as e:
+            response.close()
+            raise DownloadError(f"{download_url} dropped after {received} bytes ({e}); "
+                                "run again to resume") from e
+
+        if size and received < size:
+            raise DownloadError(f"{download_url} was truncated ({received} of {size} bytes); "
+                                "run again to resume")
+        digest = hasher.hexdigest()
+        if sha256 and digest != sha256.lower():
+            _remove_partial(partial_path)
+            if offset:
+                debug_print(f"Resumed download of {download_url} failed verification; restarting")
+                continue
+            raise DownloadError(
+                f"{download_url} failed verification (sha256 {digest}, expected {sha256}); "
+                "upstream changed or the catalog is stale")
+        break
+
+    os.replace(partial_path, dest_path)
+    _remove_partial(validator_path)
+    debug_print(f"Downloaded {received} bytes (sha256 {digest}) to: {dest_path}")
+    return dest_path
+
+def _remove_partial(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def get_download_cache_dir():
+    return os.path.join(get_quickfix_dir(), DOWNLOAD_CACHE_DIR)
+
+def download_cache_path(download_url, sha256=None):
+    """Cache location for an asset: keyed by its sha256, else by its URL."""
+    if sha256:
+        name = f"{sha256.lower()}.zip"
+    else:
+        name = f"url-{hashlib.sha256(download_url.encode('utf-8')).hexdigest()}.zip"
+    return os.path.join(get_download_cache_dir(), name)
+
+def fetch_mod_zip(download_url, sha256=None, size=None, log=print, prune=True):
+    """Return a local path to the asset, downloading it only on a cache miss.
+
+    Hits on hash-keyed entries are re-hashed before use; a corrupt one is
+    removed and downloaded again. Hits are touched so eviction is
+    least-recently-used.
+    After a download the cache is pruned unless prune is False; the install
+    pipeline prunes once at the end instead, so no worker evicts an archive
+    another job has yet to extract.
+    """
+    cache_path = download_cache_path(download_url, sha256)
+    if os.path.isfile(cache_path) and (not size or os.path.getsize(cache_path) == size):
+        if not sha256 or _hash_file_mmap(cache_path) == sha256.lower():
+            debug_print(f"Download cache hit for {download_url}: {cache_path}")
+            os.utime(cache_path)
+            return cache_path
+        log(f"[WARN] Cached download of {download_url} failed SHA-256 verification; downloading it again.")
+        os.remove(cache_path)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    download_mod_zip(download_url, cache_path, sha256=sha256, size=size, log=log)
+    if prune:
+        prune_download_cache(DOWNLOAD_CACHE_MAX_BYTES, keep=cache_path)
+    return cache_path
+
+def prune_download_cache(max_bytes, keep=None):
+    """Evict least-recently-used cached zips until the cache fits max_bytes.
+
+    Returns (files_removed, bytes_freed). Partial downloads are kept for
+    resuming until they are PARTIAL_MAX_AGE old, or max_bytes is 0.
+    """
+    cache_dir = get_download_cache_dir()
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0, 0
+
+    entries = []
+    removed = freed = 0
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if name.endswith(".zip"):
+            entries.append((st.st_mtime, st.st_size, path))
+        elif (PARTIAL_SUFFIX in name and path != keep
+              and (max_bytes == 0 or time.time() - st.st_mtime > PARTIAL_MAX_AGE)):
+            try:
+                os.remove(path)
+                removed += 1
+                freed += st.st_size
+            except OSError:
+                pass
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            debug_print(f"Could not evict {path}: {e}")
+            continue
+        total -= size
+        removed += 1
+        freed += size
+        debug_print(f"Evicted {path} from the download cache")
+    return removed, freed
+
+def download_cache_command(action, clear_all=False):
+    """`cache` shows download cache usage; `cache prune` trims it to the cap."""
+    if action not in (None, "prune"):
+        print(f"[ERROR] Unknown cache action '{action}'. Use 'cache' or 'cache prune'.")
+        return
+    if action == "prune":
+        max_bytes = 0 if clear_all else DOWNLOAD_CACHE_MAX_BYTES
+        removed, freed = prune_download_cache(max_bytes)
+        print(f"[INFO] Removed {removed} cached file(s), freed {freed / 1048576:.1f} MB.")
+    cache_dir = get_download_cache_dir()
+    try:
+        sizes = [os.path.getsize(os.path.join(cache_dir, n)) for n in os.listdir(cache_dir) if n.endswith(".zip")]
+    except OSError:
+        sizes = []
+    print(f"[INFO] Download cache: {len(sizes)} file(s), {sum(sizes) / 1048576:.1f} MB "
+          f"of {DOWNLOAD_CACHE_MAX_BYTES / 1048576:.0f} MB ({cache_dir})")
+
+def _zip_member_relpath(name):
+    """Normalise a zip entry name to a safe relative path, or None to skip it.
+
+    Backslash separators are converted (some fixes are zipped on Windows with
+    them), and absolute, drive-qualified or parent-relative entries are
+    rejected so nothing lands outside the game folder.
+    """
+    name = name.replace("\\", "/")
+    if name.startswith("/") or re.match(r"^[A-Za-z]:", name):
+        return None
+    parts = [p for p in name.split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    return "/".join(parts)
+
+def _file_digests(path):
+    """Return (crc32, sha256 hex) of a file in one read."""
+    crc = 0
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(DOWNLOAD_MAX_CHUNK), b""):
+            crc = zlib.crc32(block, crc)
+            hasher.update(block)
+    return crc, hasher.hexdigest()
+
+def extract_zip(zip_path, extract_to, previous=None, only=None, log=print):
+    """Extract zip_path into extract_to, writing only members that changed.
+
+    Each member's size and CRC32 from the central directory is compared
+    with the file already on disk; matching files are left untouched. When
+    `previous` (the records returned by an earlier extract_zip) still
+    matches a file's size and mtime, even reading the file is skipped.
+    `only` restricts extraction to those relative paths and always rewrites
+    them (used by repair). Progress and warnings go to log.
+    Returns {relative_path: {"size", "crc32", "sha256", "mtime_ns"}} for
+    every member extracted or checked.
+    """
+    log(f"[INFO] Extracting mod zip to {extract_to}...")
+    previous = previous or {}
+    records = {}
+    written = written_bytes = 0
     with zipfile.ZipFile(zip_path, "r") as zip_ref:
-        zip_ref.extractall(extract_to)
+        for info in zip_ref.infolist():
+            relpath = _zip_member_relpath(info.filename)
+            if relpath is None:
+                log(f"[WARN] Skipping unsafe zip entry: {info.filename}")
+                continue
+            if info.is_dir():
+                # Empty folders (e.g. BepInEx/plugins/) are part of some layouts.
+                if only is None:
+                    os.makedirs(os.path.join(extract_to, *relpath.split("/")), exist_ok=True)
+                continue
+            if only is not None and relpath not in only:
+                continue
+            dest = os.path.join(extract_to, *relpath.split("/"))
+            try:
+                st = os.stat(dest)
+            except OSError:
+                st = None
+
+            digest = None
+            if INCREMENTAL_EXTRACT and only is None and st is not None and st.st_size == info.file_size:
+                known = previous.get(relpath)
+                if (known and known.get("crc32") == info.CRC and known.get("sha256")
+                        and known.get("mtime_ns") == st.st_mtime_ns):
+                    digest = known["sha256"]
+                else:
+                    crc, sha256 = _file_digests(dest)
+                    if crc == info.CRC:
+                        digest = sha256
+
+            if digest is None:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                hasher = hashlib.sha256()
+                with zip_ref.open(info) as src, open(dest, "wb") as dst:
+                    for block in iter(lambda: src.read(DOWNLOAD_MAX_CHUNK), b""):
+                        hasher.update(block)
+                        dst.write(block)
+                digest = hasher.hexdigest()
+                st = os.stat(dest)
+                written += 1
+                written_bytes += info.file_size
+            records[relpath] = {"size": info.file_size, "crc32": info.CRC,
+                                "sha256": digest, "mtime_ns": st.st_mtime_ns}
+
+    log(f"[INFO] Wrote {written} of {len(records)} file(s) ({written_bytes / 1024:.1f} KB); "
+          f"{len(records) - written} unchanged.")
+    return records
+
+def get_manifest_path(mod_id, appid):
+    return os.path.join(get_quickfix_dir(), MANIFESTS_DIR, f"{mod_id}-{appid}.json")
+
+def load_install_manifest(mod_id, appid):
+    """Return the recorded manifest for mod_id in appid, or None."""
+    try:
+        with open(get_manifest_path(mod_id, appid), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_install_manifest(manifest):
+    _write_json_atomic(get_manifest_path(manifest["mod_id"], manifest["appid"]), manifest,
+                       indent=2, ensure_ascii=False)
+
+def load_install_manifests(mod_id=None):
+    """Every recorded install manifest (optionally only mod_id's), sorted by file name."""
+    manifests_dir = os.path.join(get_quickfix_dir(), MANIFESTS_DIR)
+    try:
+        names = sorted(n for n in os.listdir(manifests_dir) if n.endswith(".json"))
+    except OSError:
+        return []
+    manifests = []
+    for name in names:
+        try:
+            with open(os.path.join(manifests_dir, name), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Skipping unreadable manifest {name}: {e}")
+            continue
+        if mod_id is None or manifest.get("mod_id") == mod_id:
+            manifests.append(manifest)
+    return manifests
+
+def record_install(mod, mod_id, appid, version, install_path, zip_path, download_url, records):
+    """Write the manifest of files an install placed in a game folder."""
+    sha256, size = get_pinned_asset(mod, download_url)
+    config_names = {name.lower() for name in mod.get("config_files", [])}
+    for relpath, record in records.items():
+        # User-edited config files are only checked for presence by verify.
+        record["config"] = os.path.basename(relpath).lower() in config_names
+    save_install_manifest({
+        "schema": MANIFEST_SCHEMA,
+        "mod_id": mod_id,
+        "appid": appid,
+        "version": version,
+        "install_path": install_path,
+        "download_url": download_url,
+        "sha256": sha256,
+        "size": size,
+        "archive": zip_path,
+        "installed_at": datetime.now().isoformat(timespec="seconds"),
+        "files": records,
+    })
+
+def _hash_file_mmap(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+def _check_installed_file(install_path, relpath, record):
+    """Return None if the file is intact, else "missing" or "modified"."""
+    path = os.path.join(install_path, *relpath.split("/"))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "missing"
+    if record.get("config"):
+        return None
+    if st.st_size != record["size"]:
+        return "modified"
+    try:
+        return None if _hash_file_mmap(path) == record["sha256"] else "modified"
+    except OSError:
+        return "missing"
+
+@traced("verify installs")
+def verify_installs(manifests, jobs=DEFAULT_JOBS):
+    """Check every file of every manifest in parallel.
+
+    Returns [(manifest, {relpath: "missing" | "modified"})] in manifest order.
+    """
+    checks = [(i, relpath, m["install_path"], record)
+              for i, m in enumerate(manifests)
+              if os.path.isdir(m["install_path"])
+              for relpath, record in m["files"].items()]
+    problems = [{} for _ in manifests]
+    if checks:
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(checks)))) as pool:
+            states = pool.map(lambda c: _check_installed_file(c[2], c[1], c[3]), checks)
+            for (i, relpath, _, _), state in zip(checks, states):
+                if state:
+                    problems[i][relpath] = state
+    return list(zip(manifests, problems))
+
+def verify_command(mod_id=None, repair=False, jobs=DEFAULT_JOBS):
+    """`verify` reports missing/modified files; `repair` also restores them."""
+    manifests = load_install_manifests(mod_id)
+    if not manifests:
+        print("[INFO] No install manifests recorded" + (f" for {mod_id}." if mod_id else "."))
+        return
+
+    total = sum(len(m["files"]) for m in manifests)
+    print(f"[INFO] Verifying {total} file(s) across {len(manifests)} install(s)...")
+    for manifest, problems in verify_installs(manifests, jobs=jobs):
+        label = f"{manifest['mod_id']} for {get_steam_game_name(manifest['appid'])} ({manifest['version']})"
+        if not os.path.isdir(manifest["install_path"]):
+            print(f"[WARN] {label}: game folder {manifest['install_path']} no longer exists.")
+            continue
+        if not problems:
+            print(f"[INFO] {label}: OK")
+            continue
+        print(f"[WARN] {label}: {len(problems)} file(s) need repair")
+        for relpath, state in sorted(problems.items()):
+            print(f"  - {state}: {relpath}")
+        if repair:
+            repair_install(manifest, problems)
+
+def repair_install(manifest, problems):
+    """Re-extract only the problem files from the install's cached archive."""
+    try:
+        zip_path = manifest.get("archive")
+        if not zip_path or not os.path.isfile(zip_path):
+            zip_path = fetch_mod_zip(manifest["download_url"], sha256=manifest.get("sha256"),
+                                     size=manifest.get("size"))
+        records = extract_zip(zip_path, manifest["install_path"], only=set(problems))
+    except (DownloadError, OSError, zipfile.BadZipFile) as e:
+        print(f"[ERROR] Could not repair {manifest['mod_id']}: {e}")
+        return
+    for relpath, record in records.items():
+        record["config"] = manifest["files"][relpath].get("config", False)
+    manifest["files"].update(records)
+    manifest["archive"] = zip_path
+    save_install_manifest(manifest)
+    print(f"[INFO] Repaired {len(records)} file(s) for {manifest['mod_id']}.")
+
+def _config_candidates(mod_id, mod, game, install_path, config_name):
+    """Known config locations: where the install put it, then the catalog layout."""
+    manifest = load_install_manifest(mod_id, game["steam_appid"])
+    if manifest:
+        for relpath in manifest.get("files", {}):
+            if os.path.basename(relpath).lower() == config_name.lower():
+                yield os.path.join(install_path, *relpath.split("/"))
+    subdir = game.get("install_subdir")
+    if mod.get("zip_layout") == "flat" and subdir:
+        yield os.path.join(install_path, *subdir.split("/"), config_name)
+    yield os.path.join(install_path, config_name)
+
+def search_config_file(install_path, config_name, max_depth=CONFIG_SEARCH_MAX_DEPTH):
+    """Breadth-first search for config_name, pruning bulky content folders.
+
+    Fix configs live near the game executable, so the search stops at
+    max_depth and never descends into folders like Content/Paks or Movies.
+    """
+    target = config_name.lower()
+    level = [install_path]
+    for _ in range(max_depth + 1):
+        next_level = []
+        for directory in level:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file() and entry.name.lower() == target:
+                    return entry.path
+            next_level.extend(e.path for e in entries
+                              if e.is_dir(follow_symlinks=False)
+                              and e.name.lower() not in CONFIG_SEARCH_PRUNE)
+        level = sorted(next_level)
+        if not level:
+            break
+    return None
+
+def find_config_file(mod_id, mod, game, install_path, config_name):
+    """Locate config_name for one game, cheapest source first.
+
+    Tries the install manifest and catalog layout, then the cached result
+    of an earlier search, and only then a bounded search (whose hit is
+    cached for next time).
+    """
+    for candidate in _config_candidates(mod_id, mod, game, install_path, config_name):
+        if os.path.isfile(candidate):
+            return candidate
+
+    cache = load_config_path_cache()
+    cache_key = f"{game['steam_appid']}/{config_name.lower()}"
+    cached = cache.get(cache_key)
+    if cached:
+        cached_path = os.path.join(install_path, *cached.split("/"))
+        if os.path.isfile(cached_path):
+            return cached_path
+
+    debug_print(f"Searching {install_path} for {config_name}")
+    found_path = search_config_file(install_path, config_name)
+    if found_path:
+        cache[cache_key] = os.path.relpath(found_path, install_path).replace(os.sep, "/")
+        save_config_path_cache(cache)
+    return found_path
+
+def load_config_path_cache():
+    cache_path = os.path.join(get_quickfix_dir(), CONFIG_PATHS_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_config_path_cache(cache):
+    cache_path = os.path.join(get_quickfix_dir(), CONFIG_PATHS_FILE)
+    try:
+        _write_json_atomic(cache_path, cache, indent=2, ensure_ascii=False)
+    except OSError as e:
+        debug_print(f"Could not save config path cache: {e}")
 
 def open_config_files(mod_id, mods):
     mod = mods.get(mod_id)
@@ -301,13 +2126,7 @@ def open_config_files(mod_id, mods):
 
         # Search for each config file in the game's install path
         for config_name in config_files:
-            found_path = None
-
-            # Search recursively inside install_path
-            for root, dirs, files in os.walk(install_path):
-                if config_name in files:
-                    found_path = os.path.join(root, config_name)
-                    break
+            found_path = find_config_file(mod_id, mod, game, install_path, config_name)
 
             if found_path:
                 print(f"[INFO] Opening config file: {found_path}")
@@ -335,84 +2154,280 @@ def _select_release_zip(release_data):
     return version, preferred.get("browser_download_url")
 
 
-def get_latest_release_info(repo):
+def load_release_cache():
+    """Return {"host:repo": entry} from the release cache, or {} if unusable."""
+    cache_path = os.path.join(get_quickfix_dir(), RELEASE_CACHE_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != RELEASE_CACHE_VERSION:
+        return {}
+    return cache.get("releases", {})
+
+def save_release_cache():
+    """Persist the release cache if any lookup changed it this run."""
+    with _release_cache_lock:
+        if _release_cache is None or not _release_cache.pop("dirty", False):
+            return
+        data = {"version": RELEASE_CACHE_VERSION, "releases": dict(_release_cache)}
+    cache_path = os.path.join(get_quickfix_dir(), RELEASE_CACHE_FILE)
+    try:
+        _write_json_atomic(cache_path, data, ensure_ascii=False)
+    except OSError as e:
+        print(f"[WARN] Failed to save release cache: {e}")
+
+def cached_release_lookup(host, repo, url, get):
+    """Return the cached {status, tag, url} answer of host for repo's latest release.
+
+    Fresh entries (younger than RELEASE_CACHE_TTL) are served without a
+    request. Stale ones are revalidated with If-None-Match; a 304 only
+    refreshes the timestamp. 200 and 404 answers are cached, anything else
+    (rate limits, server errors) is returned uncached.
+    """
+    global _release_cache
+    key = f"{host}:{repo}"
+    with _release_cache_lock:
+        if _release_cache is None:
+            _release_cache = load_release_cache()
+        entry = _release_cache.get(key)
+    now = time.time()
+    if entry and now - entry.get("fetched_at", 0) < RELEASE_CACHE_TTL:
+        debug_print(f"Release cache hit for {key}")
+        return entry
+
+    headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else None
+    response = get(url, headers=headers)
+    if response.status_code == 304 and entry:
+        debug_print(f"Release info for {key} not modified")
+        entry = {**entry, "fetched_at": now}
+    elif response.status_code == 200:
+        tag, download_url = _select_release_zip(response.json())
+        entry = {"status": 200, "tag": tag, "url": download_url,
+                 "etag": response.headers.get("ETag"), "fetched_at": now}
+    elif response.status_code == 404:
+        entry = {"status": 404, "fetched_at": now}
+    else:
+        return {"status": response.status_code}
+    with _release_cache_lock:
+        _release_cache[key] = entry
+        _release_cache["dirty"] = True
+    return entry
+
+@traced("resolve release", lambda repo: {"repo": repo})
+def fetch_latest_release(repo):
+    """Return (version, download_url, error) without printing.
+
+    Safe to call from worker threads; callers decide when to report the
+    error so bulk output stays in catalog order.
+    """
     # Try Codeberg first, then fall back to GitHub for the Lyall fixes not
     # (yet) mirrored to Codeberg.
-    response = codeberg_get(f"{CODEBERG_API}/repos/{repo}/releases/latest")
-    if response.status_code == 200:
-        version, download_url = _select_release_zip(response.json())
-        if download_url:
-            return version, download_url
-
-    response = github_get(f"{GITHUB_API}/repos/{repo}/releases/latest")
-    if response.status_code == 200:
-        version, download_url = _select_release_zip(response.json())
-        if not download_url:
-            print(f"[ERROR] No download URL found for the latest release of {repo}.")
-            return None, None
+    release = cached_release_lookup("codeberg.org", repo,
+                                    f"{CODEBERG_API}/repos/{repo}/releases/latest", codeberg_get)
+    if release["status"] == 200 and release["url"]:
+        return release["tag"], release["url"], None
+
+    release = cached_release_lookup("github.com", repo,
+                                    f"{GITHUB_API}/repos/{repo}/releases/latest", github_get)
+    if release["status"] == 200:
+        if not release["url"]:
+            return None, None, f"No download URL found for the latest release of {repo}."
+        return release["tag"], release["url"], None
+
+    return None, None, f"Could not fetch release info for {repo}."
+
+def get_latest_release_info(repo):
+    try:
+        version, download_url, error = fetch_latest_release(repo)
+    except RateLimitDeferred as e:
+        version, download_url, error = None, None, f"Release lookup for {repo} deferred: {e}."
+    save_release_cache()
+    if error:
+        print(f"[ERROR] {error}")
+    return version, download_url
+
+def get_pinned_release(mod):
+    """Return (version, download_url) pinned by derive_mod_metadata.py, or None.
+
+    Entries carrying derived_release + download_url describe the exact asset
+    the refresh workflow hashed, so installing them needs no API call.
+    """
+    if not USE_PINNED_RELEASES:
+        return None
+    version = mod.get("derived_release")
+    download_url = mod.get("download_url")
+    if version and download_url:
         return version, download_url
+    return None
 
-    print(f"[ERROR] Could not fetch release info for {repo}.")
-    return None, None
+def get_release_info(mod):
+    """Return (version, download_url) for a catalog entry, pinned or live."""
+    pinned = get_pinned_release(mod)
+    if pinned:
+        debug_print(f"Using catalog-pinned release {pinned[0]} for {mod['repo']}")
+        return pinned
+    return get_latest_release_info(mod["repo"])
+
+def report_deferred_lookups(deferred, failed):
+    """Summarise release lookups that a host's rate limit pushed to a later run."""
+    reset_at = max(e.reset_at for e in deferred)
+    hosts = ", ".join(sorted({e.host for e in deferred}))
+    print(f"[WARN] {len(deferred)} release lookup(s) deferred by the {hosts} rate limit "
+          f"(resets at {datetime.fromtimestamp(reset_at):%H:%M}); {failed} failed. "
+          "Run the command again after the reset to process them.")
 
 def list_installed_mods():
     """List all installed mods and their versions."""
-    installed_mods = load_installed_mods()
-    if not installed_mods:
+    installs = get_installed_store().all_installs()
+    if not installs:
         print("[INFO] No mods are currently installed.")
         return
 
+    # Names come from the local name cache only; listing never scans libraries.
+    names = load_game_names()
     print("[INFO] Installed mods:")
-    for mod_id, version in installed_mods.items():
-        print(f"- {mod_id}: {version}")
+    for mod_id, appid, version, installed_at in installs:
+        if appid == LEGACY_APPID:
+            print(f"- {mod_id}: {version}")
+        else:
+            print(f"- {mod_id}: {version} ({names.get(appid, f'Steam App {appid}')}, installed {installed_at})")
+
+def print_startup_profile(command, phases):
+    """Print --startup-profile timings (milliseconds) and which heavy modules got loaded."""
+    timings = " | ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in phases)
+    print(f"[PROFILE] {command}: {timings}", file=sys.stderr)
+    heavy = [m for m in ("requests", "urllib3", "asyncio", "winreg") if m in sys.modules]
+    print(f"[PROFILE] deferred modules loaded: {', '.join(heavy) or 'none'}", file=sys.stderr)
 
-def main():
-    global DEBUG_MODE
+def main(argv=None):
+    global DEBUG_MODE, USE_PINNED_RELEASES, STEAM_ROOT, EXTRA_STEAM_LIBRARIES, USE_STEAM_INDEX_CACHE
+    global HTTP_TIMEOUT, HTTP_RETRIES, HTTP_POOL_SIZE, DOWNLOAD_CACHE_MAX_BYTES, _download_rate_limiter
+    global INCREMENTAL_EXTRACT, RELEASE_CACHE_TTL, _trace_events
+    main_started = time.perf_counter()
 
     parser = argparse.ArgumentParser(description="QuickFix - Manage Lyall's PC Game Fixes")
-    parser.add_argument("command", choices=["install", "update", "update-cache", "open-config", "list-mods", "list-installed"], help="Command to run")
-    parser.add_argument("mod_id", nargs="?", help="Mod ID to install, update, or open config (for 'install', 'update', or 'open-config' command)")
-    parser.add_argument("--all", action="store_true", help="Install or update all mods")
+    parser.add_argument("command", choices=["install", "update", "update-cache", "open-config", "list-mods", "list-installed", "cache", "verify", "repair", "watch"], help="Command to run")
+    parser.add_argument("mod_id", nargs="?", help="Mod ID to install, update, or open config (for 'install', 'update', or 'open-config' command); 'prune' for 'cache'")
+    parser.add_argument("--all", action="store_true", help="Install or update all mods; with 'cache prune', empty the download cache")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Parallel release lookups for --all (default: %(default)s)")
+    parser.add_argument("--download-jobs", type=int, default=DEFAULT_DOWNLOAD_JOBS, help="Parallel downloads for --all (default: %(default)s)")
+    parser.add_argument("--extract-jobs", type=int, default=DEFAULT_EXTRACT_JOBS, help="Parallel extractions for --all (default: %(default)s)")
+    parser.add_argument("--limit-rate", help="Cap total download bandwidth, e.g. 500K or 2M (bytes per second)")
+    parser.add_argument("--live", action="store_true", help="Ignore catalog-pinned releases and query Codeberg/GitHub for the latest release")
+    parser.add_argument("--steam-root", help="Steam installation folder (default: read from the registry)")
+    parser.add_argument("--steam-dir", action="append", default=[], help="Additional Steam library folder; may be repeated")
+    parser.add_argument("--rescan", action="store_true", help="Ignore the cached Steam library index and rescan every library")
+    parser.add_argument("--offline", action="store_true", help="Use the cached mods.json without contacting GitHub")
+    parser.add_argument("--background-refresh", action="store_true", help="Start from the cached mods.json and refresh it in the background")
+    parser.add_argument("--timeout", type=float, default=HTTP_TIMEOUT, help="Timeout in seconds for API and catalog requests (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=HTTP_RETRIES, help="Attempts per request on transient network errors (default: %(default)s)")
+    parser.add_argument("--release-ttl", type=int, default=RELEASE_CACHE_TTL, help="Seconds to reuse cached release info before revalidating it; 0 always revalidates (default: %(default)s)")
+    parser.add_argument("--cache-size", type=int, help=f"Download cache size limit in MB (default: {DOWNLOAD_CACHE_MAX_BYTES // 1048576})")
+    parser.add_argument("--watch-interval", type=float, default=WATCH_POLL_INTERVAL, help="Seconds between library checks for 'watch' without watchdog (default: %(default)s)")
+    parser.add_argument("--full-extract", action="store_true", help="Rewrite every file of a mod instead of only the changed ones")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--trace", metavar="FILE", help="Write timing spans of this run to FILE as Chrome/Perfetto trace JSON")
+    parser.add_argument("--startup-profile", action="store_true", help="Print how long imports, argument parsing and the command took")
     parser.add_argument("--version", action="version", version=__version__, help="Show the version")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     DEBUG_MODE = args.debug
+    USE_PINNED_RELEASES = not args.live
+    STEAM_ROOT = args.steam_root
+    EXTRA_STEAM_LIBRARIES = args.steam_dir
+    USE_STEAM_INDEX_CACHE = not args.rescan
+    INCREMENTAL_EXTRACT = not args.full_extract
+    if args.jobs < 1 or args.download_jobs < 1 or args.extract_jobs < 1:
+        parser.error("--jobs, --download-jobs and --extract-jobs must be at least 1")
+    if args.limit_rate:
+        try:
+            _download_rate_limiter = RateLimiter(parse_rate(args.limit_rate))
+        except ValueError:
+            parser.error(f"invalid --limit-rate: {args.limit_rate}")
+    if args.timeout <= 0 or args.retries < 1:
+        parser.error("--timeout must be positive and --retries at least 1")
+    HTTP_TIMEOUT = args.timeout
+    HTTP_RETRIES = args.retries
+    HTTP_POOL_SIZE = max(DEFAULT_JOBS, args.jobs, args.download_jobs)
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval must be positive")
+    if args.release_ttl < 0:
+        parser.error("--release-ttl must not be negative")
+    RELEASE_CACHE_TTL = args.release_ttl
+    if args.cache_size is not None:
+        if args.cache_size < 0:
+            parser.error("--cache-size must not be negative")
+        DOWNLOAD_CACHE_MAX_BYTES = args.cache_size * 1024 * 1024
+
+    if args.trace:
+        _trace_events = []
+    args_parsed = time.perf_counter()
+    try:
+        with trace_span(args.command, mod_id=args.mod_id, all=args.all):
+            run_command(args)
+    finally:
+        if args.trace:
+            write_trace(args.trace)
+        if args.startup_profile:
+            print_startup_profile(args.command, [
+                ("imports", main_started - _process_started),
+                ("arguments", args_parsed - main_started),
+                ("command", time.perf_counter() - args_parsed),
+            ])
+
+def run_command(args):
+    """Dispatch a parsed command line; only catalog commands load mods.json."""
+    if args.command == "update-cache":
+        if args.offline:
+            print("[ERROR] update-cache cannot run with --offline.")
+        else:
+            update_cache()  # Force update cache
+        return
+    if args.command == "cache":
+        download_cache_command(args.mod_id, clear_all=args.all)
+        return
+    if args.command in ("verify", "repair"):
+        verify_command(args.mod_id, repair=args.command == "repair", jobs=args.jobs)
+        return
+    if args.command == "list-installed":
+        list_installed_mods()
+        return
 
-    # Get the AppData path and define the folder for QuickFix
-    appdata_path = os.getenv("APPDATA")
-    quickfix_path = os.path.join(appdata_path, "QuickFix")
-
-    mods = fetch_latest_mods_json()
+    mods = load_catalog(offline=args.offline, background=args.background_refresh)
+    if mods is None:
+        return
 
     if args.command == "install":
         if args.all:
-            install_all_mods(mods)
+            install_all_mods(mods, jobs=args.jobs, download_jobs=args.download_jobs,
+                             extract_jobs=args.extract_jobs)
         elif args.mod_id:
             install_mod(args.mod_id, mods)
         else:
             print("[ERROR] Please specify a mod ID or --all")
     elif args.command == "update":
         if args.all:
-            update_all_mods(mods)
+            update_all_mods(mods, jobs=args.jobs, download_jobs=args.download_jobs,
+                            extract_jobs=args.extract_jobs)
         elif args.mod_id:
             update_mod(args.mod_id, mods)
         else:
             print("[ERROR] Please specify a mod ID or --all")
-    elif args.command == "update-cache":
-        update_cache()  # Force update cache
     elif args.command == "open-config":
         if args.mod_id:
             open_config_files(args.mod_id, mods)
         else:
             print("[ERROR] Please specify a mod ID to open its config files.")
+    elif args.command == "watch":
+        watch_command(mods, offline=args.offline, interval=args.watch_interval, jobs=args.jobs,
+                      download_jobs=args.download_jobs, extract_jobs=args.extract_jobs)
     elif args.command == "list-mods":
         print("[INFO] Listing all available mods:")
         for mod_id in mods.keys():
             print(f"- {mod_id}")
-    elif args.command == "list-installed":
-        list_installed_mods()
 
 if __name__ == "__main__":
     main()
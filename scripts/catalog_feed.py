@@ -0,0 +1,125 @@
+"""Publish a numbered revision feed for mods.json.
+
+The refresh scripts call publish() with the catalog before and after their
+edits. Each change becomes a new revision:
+
+    catalog/index.json        {"revision": N, "oldest_delta": K, "sha256": ...}
+    catalog/deltas/<N>.json   {"revision": N, "set": {mod_id: entry}, "remove": [mod_id]}
+
+Delta N turns revision N-1 into revision N: entries in "set" are added or
+replaced (new ones go last, like in mods.json) and ids in "remove" are
+dropped. sha256 is catalog_digest() of revision N, so a client can check
+the result of applying deltas. Clients holding a revision older than
+oldest_delta - 1 download the full catalog again, preferably as
+
+    catalog/mods.v<SCHEMA>.json.gz
+
+a gzipped, compact envelope {"schema", "revision", "sha256", "by_appid",
+"mods"} whose by_appid maps each Steam appid to its mod ids in catalog
+order. The schema number is in both the file name and the header; bump it
+when the envelope changes so older clients keep reading mods.json.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+CATALOG_DIR = "catalog"
+# Two revisions per 6-hourly refresh: keep about a month of deltas.
+MAX_DELTAS = 240
+ARTIFACT_SCHEMA = 1
+ARTIFACT_NAME = f"mods.v{ARTIFACT_SCHEMA}.json.gz"
+
+
+def catalog_digest(mods):
+    """SHA-256 of the catalog's canonical JSON (sorted keys, no whitespace)."""
+    canonical = json.dumps(mods, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def diff_catalog(old, new):
+    """Return ({mod_id: entry} added or changed, [mod_id removed]) from old to new."""
+    changed = {mod_id: entry for mod_id, entry in new.items() if old.get(mod_id) != entry}
+    removed = [mod_id for mod_id in old if mod_id not in new]
+    return changed, removed
+
+
+def build_appid_index(mods):
+    """Return {appid: [mod_id, ...]} with each list in catalog order (keys are strings in JSON)."""
+    index = {}
+    for mod_id, mod in mods.items():
+        for game in mod.get("games", []):
+            index.setdefault(str(game["steam_appid"]), []).append(mod_id)
+    return index
+
+
+def write_artifact(mods, revision, root="."):
+    """Write the compressed catalog artifact for `revision` of mods."""
+    envelope = {
+        "schema": ARTIFACT_SCHEMA,
+        "revision": revision,
+        "sha256": catalog_digest(mods),
+        "by_appid": build_appid_index(mods),
+        "mods": mods,
+    }
+    data = json.dumps(envelope, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    path = os.path.join(root, CATALOG_DIR, ARTIFACT_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # mtime=0 keeps the output byte-identical for an unchanged catalog.
+    with open(path, "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    print(f"🗜️ Wrote {ARTIFACT_NAME} ({len(data)} -> {os.path.getsize(path)} bytes)")
+
+
+def load_index(root="."):
+    try:
+        with open(os.path.join(root, CATALOG_DIR, "index.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def publish(old_mods, new_mods, root="."):
+    """Record new_mods as the next catalog revision; returns it, or None if unchanged.
+
+    Also rewrites the compressed artifact, so it always matches the index.
+
+    If old_mods is not the revision the index describes (mods.json was
+    edited by hand in between), the delta chain restarts at the new
+    revision so clients fall back to a full download once.
+    """
+    index = load_index(root)
+    new_digest = catalog_digest(new_mods)
+    if index.get("sha256") == new_digest:
+        if not os.path.exists(os.path.join(root, CATALOG_DIR, ARTIFACT_NAME)):
+            write_artifact(new_mods, index["revision"], root)
+        return None
+
+    revision = index.get("revision", 0) + 1
+    changed, removed = diff_catalog(old_mods, new_mods)
+    _write_json(os.path.join(root, CATALOG_DIR, "deltas", f"{revision}.json"),
+                {"revision": revision, "set": changed, "remove": removed})
+
+    oldest = index.get("oldest_delta", revision)
+    if index.get("sha256") != catalog_digest(old_mods):
+        oldest = revision
+    oldest = max(oldest, revision - MAX_DELTAS + 1)
+    deltas_dir = os.path.join(root, CATALOG_DIR, "deltas")
+    for name in os.listdir(deltas_dir):
+        number = name.removesuffix(".json")
+        if number.isdigit() and int(number) < oldest:
+            os.remove(os.path.join(deltas_dir, name))
+
+    _write_json(os.path.join(root, CATALOG_DIR, "index.json"),
+                {"revision": revision, "oldest_delta": oldest, "sha256": new_digest})
+    write_artifact(new_mods, revision, root)
+    print(f"📰 Published catalog revision {revision} "
+          f"({len(changed)} changed, {len(removed)} removed)")
+    return revision
@@ -1,11 +1,13 @@
 import argparse
+import copy
 import hashlib
 import io
 import json
 import os
 import zipfile
 
-import requests
+import catalog_feed
+import tracing
 
 CODEBERG_API = "https://codeberg.org/api/v1"
 GITHUB_API = "https://api.github.com"
@@ -59,7 +61,7 @@ def codeberg_get(url):
     token = os.environ.get("CODEBERG_TOKEN")
     if token:
         headers["Authorization"] = f"token {token}"
-    return requests.get(url, headers=headers, timeout=15)
+    return tracing.get(url, headers=headers, timeout=15)
 
 
 def github_get(url):
@@ -67,7 +69,7 @@ def github_get(url):
     token = os.environ.get("GITHUB_TOKEN")
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    return requests.get(url, headers=headers, timeout=15)
+    return tracing.get(url, headers=headers, timeout=15)
 
 
 def parse_release_assets(data):
@@ -104,7 +106,7 @@ def get_latest_zip_asset(repo):
 
 
 def download(url):
-    resp = requests.get(url, timeout=60)
+    resp = tracing.get(url, timeout=60)
     resp.raise_for_status()
     return resp.content
 
@@ -156,22 +158,26 @@ def main():
     with open("mods.json", "r", encoding="utf-8") as f:
         mods = json.load(f)
 
+    original = copy.deepcopy(mods)
     changed = False
     for mod_id, mod in mods.items():
         if args.only and mod_id not in args.only:
             continue
-        release = get_latest_zip_asset(mod["repo"])
+        with tracing.span("resolve release", mod_id=mod_id):
+            release = get_latest_zip_asset(mod["repo"])
         if release is None:
             print(f"⚠️ {mod_id}: no release with a .zip asset")
             continue
         if needs_derivation(mod, release["tag"]):
             print(f"🔬 Deriving {mod_id} @ {release['tag']}")
             try:
-                blob = download(release["url"])
+                with tracing.span("download", mod_id=mod_id):
+                    blob = download(release["url"])
             except Exception as e:
                 print(f"⚠️ {mod_id}: download failed: {e}")
                 continue
-            derive_mod(mod, release, blob)
+            with tracing.span("derive", mod_id=mod_id):
+                derive_mod(mod, release, blob)
             changed = True
         else:
             print(f"✅ {mod_id}: up to date ({release['tag']})")
@@ -179,6 +185,7 @@ def main():
     if changed:
         with open("mods.json", "w", encoding="utf-8") as f:
             json.dump(mods, f, indent=2, ensure_ascii=False)
+        catalog_feed.publish(original, mods)
         print("✅ mods.json updated with derived metadata.")
 
     scope = {k: mods[k] for k in args.only} if args.only else mods
@@ -0,0 +1,66 @@
+"""Chrome/Perfetto trace spans for the catalog scripts.
+
+Set QUICKFIX_TRACE=trace.json to record a span for every phase and HTTP
+request; the file is written when the script exits and can be opened in
+chrome://tracing or ui.perfetto.dev. Without the variable span() is a no-op.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+TRACE_PATH = os.environ.get("QUICKFIX_TRACE")
+
+_events = []
+_lock = threading.Lock()
+_started = time.perf_counter()
+
+
+@contextmanager
+def span(name, **args):
+    """Time the block as a "complete" event; yields args for the block to extend."""
+    if not TRACE_PATH:
+        yield args
+        return
+    begin = time.perf_counter()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        event = {"name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                 "ts": round((begin - _started) * 1e6),
+                 "dur": round((time.perf_counter() - begin) * 1e6), "args": args}
+        with _lock:
+            _events.append(event)
+
+
+def get(url, **kwargs):
+    """requests.get inside an "http GET" span recording host, status and bytes."""
+    parsed = urlparse(url)
+    with span("http GET", host=parsed.netloc, path=parsed.path) as args:
+        response = requests.get(url, **kwargs)
+        args["status"] = response.status_code
+        args["bytes"] = len(response.content)
+    return response
+
+
+def write(path=None):
+    """Write the recorded spans to path (default: $QUICKFIX_TRACE)."""
+    path = path or TRACE_PATH
+    if not path:
+        return
+    with _lock:
+        events = list(_events)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+if TRACE_PATH:
+    atexit.register(write)
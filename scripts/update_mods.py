@@ -1,10 +1,12 @@
-import requests
 import json
 import os
 import re
 import unicodedata
 import copy
 
+import catalog_feed
+import tracing
+
 BLOCKLIST = [
     "Lyall/BepInEx",
     "Lyall/BipedFix"
@@ -18,7 +20,7 @@ def codeberg_get(url):
     headers = {}
     if API_TOKEN:
         headers["Authorization"] = f"token {API_TOKEN}"
-    return requests.get(url, headers=headers, timeout=10)
+    return tracing.get(url, headers=headers, timeout=10)
 
 def fetch_repos():
     repos = []
@@ -99,7 +101,7 @@ def guess_game_from_repo(repo):
     print(f"🔎 Attempting Steam search for: '{search_term}'...")
 
     try:
-        steam_response = requests.get(STEAM_SEARCH_API.format(search_term), timeout=5)
+        steam_response = tracing.get(STEAM_SEARCH_API.format(search_term), timeout=5)
         steam_response.raise_for_status()
         results = steam_response.json().get("items", [])
         if results:
@@ -188,7 +190,7 @@ def extract_readme_game_names(readme_text):
 def steam_search_appid(term):
     """Top Steam appid for a game name, or None (best-effort — the human verifies)."""
     try:
-        resp = requests.get(STEAM_SEARCH_API.format(term), timeout=5)
+        resp = tracing.get(STEAM_SEARCH_API.format(term), timeout=5)
         resp.raise_for_status()
         items = resp.json().get("items", [])
         return items[0].get("id") if items else None
@@ -236,7 +238,8 @@ def refresh_existing_entry(existing_entry, full_name, repo_updated_at):
     return new_entry
 
 def main():
-    repos = fetch_repos()
+    with tracing.span("fetch repos"):
+        repos = fetch_repos()
     existing_mods = load_existing_mods()
 
     updated_mods = copy.deepcopy(existing_mods)
@@ -261,10 +264,12 @@ def main():
 
             if mod_id not in existing_mods:
                 print(f"🆕 New mod detected: {mod_id}")
-                appid = guess_game_from_repo(repo)
+                with tracing.span("guess game", mod_id=mod_id):
+                    appid = guess_game_from_repo(repo)
                 
                 # Detect config files from README
-                config_files = get_config_files_from_readme(full_name, f"{name}.ini")
+                with tracing.span("detect config files", mod_id=mod_id):
+                    config_files = get_config_files_from_readme(full_name, f"{name}.ini")
                 
                 updated_mods[mod_id] = {
                     "repo": full_name,
@@ -289,6 +294,7 @@ def main():
     # Write updated mods.json
     with open("mods.json", "w", encoding="utf-8") as f:
         json.dump(updated_mods, f, indent=2, ensure_ascii=False)
+    catalog_feed.publish(existing_mods, updated_mods)
 
     # Write pull request body
     with open("pr_body.md", "w", encoding="utf-8") as f:
@@ -316,7 +322,8 @@ def main():
             f.write("No changes detected.\n")
 
     print("🔎 Re-checking multi-game mods for newly-supported titles...")
-    gaps = flag_multigame_gaps(updated_mods)
+    with tracing.span("multi-game check"):
+        gaps = flag_multigame_gaps(updated_mods)
     if gaps:
         with open("pr_body.md", "a", encoding="utf-8") as f:
             f.write("\n#### 🎮 Multi-game mods: possible new titles\n")
@@ -5,8 +5,7 @@ import sys
 import time
 from urllib.parse import urlparse
 
-import requests
-
+import tracing
 from derive_mod_metadata import KNOWN_PROXY_DLLS
 
 API_TOKEN = os.environ.get("CODEBERG_TOKEN")
@@ -25,7 +24,7 @@ def codeberg_get(url, retries=3):
     if API_TOKEN:
         headers["Authorization"] = f"token {API_TOKEN}"
     for attempt in range(retries):
-        response = requests.get(url, headers=headers, timeout=10)
+        response = tracing.get(url, headers=headers, timeout=10)
         # 4xx is a definitive answer (e.g. repo gone) — only retry transient errors.
         if response.status_code < 500:
             return response
@@ -39,7 +38,7 @@ def github_get(url):
     token = os.environ.get("GITHUB_TOKEN")
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    return requests.get(url, headers=headers, timeout=10)
+    return tracing.get(url, headers=headers, timeout=10)
 
 
 def repo_exists(repo):
@@ -120,7 +119,9 @@ def validate_mods():
         for error in errors:
             print(f"❌ {mod_id}: {error}")
             failed = True
-        if mod.get("repo") and not repo_exists(mod["repo"]):
+        with tracing.span("check repo", mod_id=mod_id):
+            exists = not mod.get("repo") or repo_exists(mod["repo"])
+        if not exists:
             # Only warn when the repo is on neither Codeberg nor GitHub; a
             # GitHub-only fix still derives and installs via the fallback.
             print(f"⚠️ {mod_id}: repo '{mod['repo']}' not found on Codeberg or GitHub.")
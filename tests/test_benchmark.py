@@ -0,0 +1,22 @@
+from benchmarks.harness import check_budget, run_benchmark
+
+
+def test_benchmark_smoke(tmp_path):
+    results = {r["command"]: r for r in run_benchmark(str(tmp_path), 20, installed=4, open_config_samples=4)}
+    assert list(results) == ["install --all", "update --all", "open-config"]
+
+    install = results["install --all"]["requests"]
+    assert install["catalog"] == 1
+    assert install["assets"] == 4  # one download per installed game
+
+    update = results["update --all"]["requests"]
+    assert update["assets"] == 1  # only the mod with a new release
+    assert results["open-config"]["requests"] == {"codeberg": 0, "github": 0, "assets": 0, "catalog": 0}
+
+
+def test_check_budget_flags_only_exceeded_ceilings():
+    results = [{"mods": 100, "command": "install --all", "seconds": 0.4,
+                "requests": {"codeberg": 7, "assets": 10}},
+               {"mods": 50, "command": "install --all", "seconds": 99, "requests": {}}]
+    budget = {"100": {"install --all": {"seconds": 0.5, "requests": {"codeberg": 6, "assets": 10, "github": 0}}}}
+    assert check_budget(results, budget) == ["100 mods install --all: 7 codeberg requests > 6"]
@@ -0,0 +1,83 @@
+import pytest
+import requests
+
+import quickfix
+
+CATALOG = {"FooFix": {"repo": "Lyall/FooFix", "games": [{"steam_appid": 1}]}}
+
+
+@pytest.fixture(autouse=True)
+def appdata(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    monkeypatch.setattr(quickfix, "fetch_catalog_index", lambda: None)  # no revision feed
+    monkeypatch.setattr(quickfix, "fetch_catalog_artifact", lambda etag=None: None)
+    return tmp_path
+
+
+def _fetch(result=None, error=None, seen=None):
+    def fetch(etag=None):
+        if seen is not None:
+            seen.append(etag)
+        if error:
+            raise error
+        return result
+    return fetch
+
+
+def test_first_run_downloads_and_caches(monkeypatch):
+    monkeypatch.setattr(quickfix, "fetch_latest_mods_json", _fetch((CATALOG, '"v1"')))
+    assert quickfix.load_catalog() == CATALOG
+    assert quickfix.load_local_mods_json() == CATALOG
+    assert quickfix.load_catalog_meta()["etag"] == '"v1"'
+
+
+def test_not_modified_serves_cache_and_sends_etag(monkeypatch):
+    quickfix.save_local_mods_json(CATALOG, '"v1"')
+    seen = []
+    monkeypatch.setattr(quickfix, "fetch_latest_mods_json", _fetch((None, '"v1"'), seen=seen))
+    assert quickfix.load_catalog() == CATALOG
+    assert seen == ['"v1"']
+
+
+def test_unreachable_github_falls_back_to_cache(monkeypatch):
+    quickfix.save_local_mods_json(CATALOG, '"v1"')
+    monkeypatch.setattr(quickfix, "fetch_latest_mods_json",
+                        _fetch(error=requests.ConnectionError("offline")))
+    assert quickfix.load_catalog() == CATALOG
+
+
+@pytest.mark.parametrize("error", [quickfix.RateLimitDeferred("raw.githubusercontent.com", 0),
+                                   OSError("disk error")])
+def test_rate_limited_or_failing_refresh_falls_back_to_cache(monkeypatch, error):
+    quickfix.save_local_mods_json(CATALOG, '"v1"')
+
+    def http_get(*args, **kwargs):
+        raise error
+    monkeypatch.setattr(quickfix, "http_get", http_get)
+    assert quickfix.load_catalog() == CATALOG
+
+
+def test_unreachable_github_without_cache_raises(monkeypatch):
+    monkeypatch.setattr(quickfix, "fetch_latest_mods_json",
+                        _fetch(error=requests.ConnectionError("offline")))
+    with pytest.raises(requests.ConnectionError):
+        quickfix.load_catalog()
+
+
+def test_offline_never_fetches(monkeypatch):
+    monkeypatch.setattr(quickfix, "fetch_latest_mods_json",
+                        _fetch(error=AssertionError("fetched while offline")))
+    assert quickfix.load_catalog(offline=True) is None
+    quickfix.save_local_mods_json(CATALOG)
+    assert quickfix.load_catalog(offline=True) == CATALOG
+
+
+def test_background_refresh_serves_stale_then_updates(monkeypatch):
+    quickfix.save_local_mods_json(CATALOG, '"v1"')
+    newer = {**CATALOG, "BarFix": {"repo": "Lyall/BarFix", "games": []}}
+    monkeypatch.setattr(quickfix, "fetch_latest_mods_json", _fetch((newer, '"v2"')))
+    assert quickfix.load_catalog(background=True) == CATALOG
+    for thread in quickfix.threading.enumerate():
+        if thread.name == "catalog-refresh":
+            thread.join()
+    assert quickfix.load_local_mods_json() == newer
@@ -0,0 +1,159 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import catalog_feed
+import quickfix
+
+V1 = {"AFix": {"repo": "Lyall/AFix", "derived_release": "1.0"},
+      "BFix": {"repo": "Lyall/BFix", "derived_release": "2.0"}}
+V2 = {"AFix": {"repo": "Lyall/AFix", "derived_release": "1.1"},
+      "BFix": {"repo": "Lyall/BFix", "derived_release": "2.0"},
+      "CFix": {"repo": "Lyall/CFix"}}
+V3 = {"AFix": V2["AFix"], "CFix": V2["CFix"]}
+
+
+class _Resp:
+    def __init__(self, status, content=b""):
+        self.status_code = status
+        self.content = content
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    """Serves tmp_path/repo over a fake http_get and records the paths fetched."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.setattr(quickfix, "CATALOG_URL", "https://raw/mods.json")
+    monkeypatch.setattr(quickfix, "CATALOG_FEED_URL", "https://raw/catalog")
+    fetched = []
+
+    def http_get(url, headers=None, **kwargs):
+        path = url.removeprefix("https://raw/")
+        fetched.append(path)
+        full = repo / path
+        if not full.exists():
+            return _Resp(404)
+        return _Resp(200, full.read_bytes())
+    monkeypatch.setattr(quickfix, "http_get", http_get)
+
+    def release(old, new):
+        (repo / "mods.json").write_text(json.dumps(new))
+        return catalog_feed.publish(old, new, root=str(repo))
+    return release, fetched, repo
+
+
+def test_publish_numbers_revisions_and_records_deltas(feed):
+    release, _, repo = feed
+    assert release({}, V1) == 1
+    assert release(V1, V1) is None
+    assert release(V1, V2) == 2
+    delta = json.loads((repo / "catalog" / "deltas" / "2.json").read_text())
+    assert delta == {"revision": 2, "set": {"AFix": V2["AFix"], "CFix": V2["CFix"]}, "remove": []}
+    index = json.loads((repo / "catalog" / "index.json").read_text())
+    assert index["sha256"] == catalog_feed.catalog_digest(V2)
+
+
+def test_client_applies_deltas_since_its_revision(feed):
+    release, fetched, _ = feed
+    release({}, V1)
+    assert quickfix.load_catalog() == V1
+    assert quickfix.load_catalog_meta()["revision"] == 1
+
+    release(V1, V2)
+    release(V2, V3)
+    fetched.clear()
+    assert quickfix.load_catalog() == V3
+    assert fetched == ["catalog/index.json", "catalog/deltas/2.json", "catalog/deltas/3.json"]
+    assert quickfix.load_catalog_meta()["revision"] == 3
+
+    fetched.clear()
+    assert quickfix.load_catalog() == V3
+    assert fetched == ["catalog/index.json"]
+
+
+def test_large_gap_falls_back_to_full_download(feed, monkeypatch):
+    release, fetched, _ = feed
+    release({}, V1)
+    quickfix.load_catalog()
+    monkeypatch.setattr(quickfix, "CATALOG_MAX_DELTAS", 1)
+    release(V1, V2)
+    release(V2, V3)
+    fetched.clear()
+    assert quickfix.load_catalog() == V3
+    assert fetched == ["catalog/index.json", "catalog/mods.v1.json.gz"]
+    assert quickfix.load_catalog_meta()["revision"] == 3
+
+
+def test_pruned_or_diverged_deltas_fall_back(feed, monkeypatch):
+    release, fetched, repo = feed
+    release({}, V1)
+    quickfix.load_catalog()
+    monkeypatch.setattr(catalog_feed, "MAX_DELTAS", 1)
+    release(V1, V2)
+    release(V2, V3)
+    assert sorted(os.listdir(repo / "catalog" / "deltas")) == ["3.json"]
+    fetched.clear()
+    assert quickfix.load_catalog() == V3
+    assert fetched[-1] == "catalog/mods.v1.json.gz"
+
+
+def test_hand_edited_catalog_restarts_the_chain(feed):
+    release, _, repo = feed
+    release({}, V1)
+    release(V2, V3)  # mods.json was edited to V2 outside the refresh scripts
+    index = json.loads((repo / "catalog" / "index.json").read_text())
+    assert index["revision"] == 2 and index["oldest_delta"] == 2
+
+
+def test_artifact_is_compact_gzip_with_appid_index(feed):
+    release, _, repo = feed
+    mods = {"AFix": {"games": [{"steam_appid": 10}, {"steam_appid": 20}]},
+            "BFix": {"games": [{"steam_appid": 20}]}}
+    release({}, mods)
+    raw = (repo / "catalog" / "mods.v1.json.gz").read_bytes()
+    envelope = json.loads(gzip.decompress(raw))
+    assert envelope["schema"] == 1 and envelope["revision"] == 1
+    assert envelope["by_appid"] == {"10": ["AFix"], "20": ["AFix", "BFix"]}
+    assert envelope["mods"] == mods
+    release(mods, mods)
+    assert (repo / "catalog" / "mods.v1.json.gz").read_bytes() == raw
+
+
+def test_first_run_prefers_artifact_and_reuses_its_index(feed, monkeypatch):
+    release, fetched, _ = feed
+    mods = {"AFix": {"games": [{"steam_appid": 10}]}, "BFix": {"games": [{"steam_appid": 20}]}}
+    release({}, mods)
+    assert quickfix.load_catalog() == mods
+    assert fetched == ["catalog/index.json", "catalog/mods.v1.json.gz"]
+    assert quickfix.load_catalog_meta()["revision"] == 1
+
+    monkeypatch.setattr(quickfix, "build_appid_index", lambda mods: pytest.fail("index rebuilt"))
+    cached = quickfix.load_catalog(offline=True)
+    assert quickfix.match_installed_mods(cached, {20}) == ["BFix"]
+
+
+def test_unknown_artifact_schema_falls_back_to_mods_json(feed):
+    release, fetched, repo = feed
+    release({}, V1)
+    artifact = repo / "catalog" / "mods.v1.json.gz"
+    envelope = json.loads(gzip.decompress(artifact.read_bytes()))
+    artifact.write_bytes(gzip.compress(json.dumps({**envelope, "schema": 2}).encode()))
+    assert quickfix.load_catalog() == V1
+    assert fetched == ["catalog/index.json", "catalog/mods.v1.json.gz", "mods.json"]
+
+
+def test_legacy_mods_json_cache_is_still_read(feed, tmp_path):
+    (tmp_path / "appdata" / "QuickFix").mkdir(parents=True)
+    (tmp_path / "appdata" / "QuickFix" / "mods.json").write_text(json.dumps(V1))
+    assert quickfix.load_catalog(offline=True) == V1
@@ -0,0 +1,66 @@
+import pytest
+
+import quickfix
+
+
+@pytest.fixture
+def game(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    root = tmp_path / "Game"
+    (root / "Game" / "Binaries" / "Win64").mkdir(parents=True)
+    (root / "Game" / "Content" / "Paks").mkdir(parents=True)
+    return root
+
+
+def _search_spy(monkeypatch):
+    calls = []
+    real = quickfix.search_config_file
+    monkeypatch.setattr(quickfix, "search_config_file",
+                        lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    return calls
+
+
+def test_flat_layout_goes_straight_to_install_subdir(game, monkeypatch):
+    ini = game / "Game" / "Binaries" / "Win64" / "Fix.ini"
+    ini.write_text("")
+    calls = _search_spy(monkeypatch)
+    mod = {"zip_layout": "flat"}
+    entry = {"steam_appid": 1, "install_subdir": "Game/Binaries/Win64"}
+    assert quickfix.find_config_file("Fix", mod, entry, str(game), "Fix.ini") == str(ini)
+    assert calls == []
+
+
+def test_manifest_location_is_used(game, monkeypatch):
+    ini = game / "Game" / "Binaries" / "Win64" / "Fix.ini"
+    ini.write_text("")
+    quickfix.save_install_manifest({"mod_id": "Fix", "appid": 1, "files": {
+        "Game/Binaries/Win64/Fix.ini": {"size": 0}}})
+    calls = _search_spy(monkeypatch)
+    assert quickfix.find_config_file("Fix", {}, {"steam_appid": 1}, str(game), "fix.ini") == str(ini)
+    assert calls == []
+
+
+def test_fallback_search_result_is_cached(game, monkeypatch):
+    ini = game / "Game" / "Binaries" / "Win64" / "Fix.ini"
+    ini.write_text("")
+    calls = _search_spy(monkeypatch)
+    for _ in range(2):
+        assert quickfix.find_config_file("Fix", {}, {"steam_appid": 1}, str(game), "Fix.ini") == str(ini)
+    assert len(calls) == 1
+
+
+def test_search_prunes_content_folders_and_depth(game):
+    (game / "Game" / "Content" / "Paks" / "Fix.ini").write_text("")
+    assert quickfix.search_config_file(str(game), "Fix.ini") is None
+
+    deep = game / "a" / "b" / "c"
+    deep.mkdir(parents=True)
+    (deep / "Fix.ini").write_text("")
+    assert quickfix.search_config_file(str(game), "Fix.ini", max_depth=2) is None
+    assert quickfix.search_config_file(str(game), "Fix.ini", max_depth=3) == str(deep / "Fix.ini")
+
+
+def test_search_prefers_shallowest_match(game):
+    (game / "Game" / "Binaries" / "Win64" / "Fix.ini").write_text("")
+    (game / "Fix.ini").write_text("")
+    assert quickfix.search_config_file(str(game), "Fix.ini") == str(game / "Fix.ini")
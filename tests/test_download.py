@@ -0,0 +1,264 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import quickfix
+
+PAYLOAD = b"PK" + bytes(range(256)) * 1024
+
+
+class _Raw(io.BytesIO):
+    def __init__(self, body, drop_after=None):
+        super().__init__(body)
+        self.drop_after = drop_after
+
+    def read(self, n=-1, decode_content=False):
+        if self.drop_after is not None and self.tell() >= self.drop_after:
+            raise ConnectionResetError("connection dropped")
+        if self.drop_after is not None:
+            n = min(n, self.drop_after - self.tell())
+        return super().read(n)
+
+
+class _Resp:
+    def __init__(self, body, status=200, headers=None, drop_after=None):
+        self.raw = _Raw(body, drop_after)
+        self.status_code = status
+        self.headers = headers or {}
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def close(self):
+        self.closed = True
+
+
+class _Server:
+    """Serves one body; honours Range/If-Range unless ranges=False."""
+
+    def __init__(self, body, etag='"v1"', ranges=True, content_length=True, drop_after=None):
+        self.body, self.etag, self.ranges = body, etag, ranges
+        self.content_length, self.drop_after = content_length, drop_after
+        self.requests = []
+        self.last = None
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        rng = headers.get("Range")
+        if rng and self.ranges and headers.get("If-Range", self.etag) == self.etag:
+            start = int(rng[len("bytes="):-1])
+            if start >= len(self.body):
+                body, resp_headers, status = b"", {"Content-Range": f"bytes */{len(self.body)}"}, 416
+            else:
+                body = self.body[start:]
+                resp_headers = {"Content-Range": f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"}
+                status = 206
+        else:
+            body, resp_headers, status = self.body, {}, 200
+        resp_headers["ETag"] = self.etag
+        if self.content_length:
+            resp_headers["Content-Length"] = str(len(body))
+        drop, self.drop_after = self.drop_after, None  # only the first response drops
+        self.last = _Resp(body, status, resp_headers, drop)
+        return self.last
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    def install(body, **kwargs):
+        server = _Server(body, **kwargs)
+        monkeypatch.setattr(quickfix, "http_get", server.get)
+        return server
+    return install
+
+
+@pytest.fixture
+def dest(tmp_path):
+    return str(tmp_path / "F.zip")
+
+
+def test_verified_download(serve, dest):
+    serve(PAYLOAD)
+    path = quickfix.download_mod_zip("https://x/F.zip", dest, sha256=hashlib.sha256(PAYLOAD).hexdigest(),
+                                     size=len(PAYLOAD))
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert os.listdir(os.path.dirname(dest)) == ["F.zip"]
+
+
+def test_unpinned_download_is_not_verified(serve, dest):
+    serve(PAYLOAD)
+    assert os.path.getsize(quickfix.download_mod_zip("https://x/F.zip", dest)) == len(PAYLOAD)
+
+
+def test_digest_mismatch_rejected_and_cleaned_up(serve, dest):
+    serve(PAYLOAD)
+    with pytest.raises(quickfix.DownloadError, match="verification"):
+        quickfix.download_mod_zip("https://x/F.zip", dest, sha256="0" * 64, size=len(PAYLOAD))
+    assert not any(n.endswith(".part") for n in os.listdir(os.path.dirname(dest)))
+    assert not os.path.exists(dest)
+
+
+def test_oversized_content_length_aborts_before_reading(serve, dest):
+    server = serve(PAYLOAD)
+    with pytest.raises(quickfix.DownloadError):
+        quickfix.download_mod_zip("https://x/F.zip", dest, size=100)
+    assert server.last.closed and server.last.raw.tell() == 0
+    assert not os.path.exists(dest)
+
+
+def test_running_size_aborts_without_content_length(serve, dest):
+    server = serve(PAYLOAD, content_length=False)
+    with pytest.raises(quickfix.DownloadError, match="exceeded"):
+        quickfix.download_mod_zip("https://x/F.zip", dest, size=1000)
+    assert server.last.raw.tell() < len(PAYLOAD)
+    assert not os.path.exists(dest + quickfix.PARTIAL_SUFFIX)
+
+
+def test_dropped_download_resumes_with_range(serve, dest):
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    server = serve(PAYLOAD, drop_after=100_000)
+    with pytest.raises(quickfix.DownloadError, match="resume"):
+        quickfix.download_mod_zip("https://x/F.zip", dest, sha256=sha, size=len(PAYLOAD))
+    assert os.path.getsize(dest + quickfix.PARTIAL_SUFFIX) == 100_000
+
+    quickfix.download_mod_zip("https://x/F.zip", dest, sha256=sha, size=len(PAYLOAD))
+    assert server.requests[-1] == {"Range": "bytes=100000-", "If-Range": '"v1"'}
+    assert server.last.status_code == 206
+    with open(dest, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_server_ignoring_ranges_restarts_from_zero(serve, dest):
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    server = serve(PAYLOAD, ranges=False, drop_after=100_000)
+    with pytest.raises(quickfix.DownloadError):
+        quickfix.download_mod_zip("https://x/F.zip", dest, sha256=sha, size=len(PAYLOAD))
+    quickfix.download_mod_zip("https://x/F.zip", dest, sha256=sha, size=len(PAYLOAD))
+    assert server.last.status_code == 200
+    with open(dest, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_changed_content_restarts_from_zero(serve, dest):
+    changed = PAYLOAD[::-1]
+    serve(PAYLOAD, drop_after=100_000)
+    with pytest.raises(quickfix.DownloadError):
+        quickfix.download_mod_zip("https://x/F.zip", dest, size=len(PAYLOAD))
+    server = serve(changed, etag='"v2"')
+    quickfix.download_mod_zip("https://x/F.zip", dest, size=len(PAYLOAD))
+    assert server.last.status_code == 200   # If-Range no longer matched
+    with open(dest, "rb") as f:
+        assert f.read() == changed
+
+
+def test_complete_partial_without_size_restarts_on_416(serve, dest):
+    server = serve(PAYLOAD, drop_after=len(PAYLOAD))  # dropped right at EOF
+    with pytest.raises(quickfix.DownloadError, match="resume"):
+        quickfix.download_mod_zip("https://x/F.zip", dest)
+    assert os.path.getsize(dest + quickfix.PARTIAL_SUFFIX) == len(PAYLOAD)
+
+    quickfix.download_mod_zip("https://x/F.zip", dest)
+    assert server.requests[-2] == {"Range": f"bytes={len(PAYLOAD)}-", "If-Range": '"v1"'}
+    assert server.requests[-1] == {}
+    with open(dest, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_corrupt_partial_is_discarded_after_verification(serve, dest):
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    with open(dest + quickfix.PARTIAL_SUFFIX, "wb") as f:
+        f.write(b"garbage")
+    serve(PAYLOAD, etag=None)
+    quickfix.download_mod_zip("https://x/F.zip", dest, sha256=sha, size=len(PAYLOAD))
+    with open(dest, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_pinned_asset_only_for_catalog_url():
+    mod = {"download_url": "https://x/F.zip", "sha256": "a" * 64, "size": 5}
+    assert quickfix.get_pinned_asset(mod, "https://x/F.zip") == ("a" * 64, 5)
+    assert quickfix.get_pinned_asset(mod, "https://x/Other.zip") == (None, None)
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    downloads = []
+
+    def fake_download(url, dest_path, sha256=None, size=None, log=print):
+        downloads.append(url)
+        with open(dest_path, "wb") as f:
+            f.write(PAYLOAD)
+        return dest_path
+    monkeypatch.setattr(quickfix, "download_mod_zip", fake_download)
+    return downloads
+
+
+def test_cache_downloads_each_artifact_once(cache):
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    first = quickfix.fetch_mod_zip("https://x/F.zip", sha256=sha, size=len(PAYLOAD))
+    second = quickfix.fetch_mod_zip("https://mirror/F.zip", sha256=sha, size=len(PAYLOAD))
+    assert first == second and os.path.basename(first) == f"{sha}.zip"
+    assert cache == ["https://x/F.zip"]
+
+
+def test_corrupt_cache_hit_is_downloaded_again(cache, capsys):
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    path = quickfix.download_cache_path("https://x/F.zip", sha)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(b"X" * len(PAYLOAD))  # right size, wrong content
+    assert quickfix.fetch_mod_zip("https://x/F.zip", sha256=sha, size=len(PAYLOAD)) == path
+    assert cache == ["https://x/F.zip"]
+    assert "failed SHA-256 verification" in capsys.readouterr().out
+    with open(path, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_unpinned_assets_are_keyed_by_url(cache):
+    a = quickfix.fetch_mod_zip("https://x/A.zip")
+    assert quickfix.fetch_mod_zip("https://x/A.zip") == a
+    assert quickfix.fetch_mod_zip("https://x/B.zip") != a
+    assert len(cache) == 2
+
+
+def test_prune_evicts_least_recently_used(cache):
+    paths = [quickfix.fetch_mod_zip(f"https://x/{i}.zip") for i in range(3)]
+    for age, path in enumerate(reversed(paths)):
+        os.utime(path, (1000 - age, 1000 - age))
+    quickfix.fetch_mod_zip("https://x/0.zip")  # hit refreshes 0's recency
+
+    removed, freed = quickfix.prune_download_cache(2 * len(PAYLOAD))
+    assert (removed, freed) == (1, len(PAYLOAD))
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[0]) and os.path.exists(paths[2])
+
+
+def test_parse_rate():
+    assert quickfix.parse_rate("500K") == 500 * 1024
+    assert quickfix.parse_rate("2mb") == 2 * 1024 * 1024
+    assert quickfix.parse_rate("1000") == 1000
+    with pytest.raises(ValueError):
+        quickfix.parse_rate("0")
+
+
+def test_rate_limiter_sleeps_off_debt(monkeypatch):
+    clock = [0.0]
+    sleeps = []
+    monkeypatch.setattr(quickfix.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(quickfix.time, "sleep", sleeps.append)
+    limiter = quickfix.RateLimiter(1000)
+    limiter.consume(1000)          # the initial burst allowance
+    assert sleeps == []
+    limiter.consume(500)           # half a second of debt
+    assert sleeps == [0.5]
+    clock[0] = 2.0                 # idle time refills, but only up to one second's worth
+    limiter.consume(1000)
+    assert sleeps == [0.5]
+
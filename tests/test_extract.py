@@ -0,0 +1,96 @@
+import os
+import zipfile
+
+import pytest
+
+import quickfix
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Records every member extract_zip actually writes."""
+    written = []
+    real_open = quickfix.zipfile.ZipFile.open
+
+    def spy(self, info, mode="r", *args, **kwargs):
+        if mode == "r":
+            written.append(info.filename)
+        return real_open(self, info, mode, *args, **kwargs)
+    monkeypatch.setattr(quickfix.zipfile.ZipFile, "open", spy)
+    return written
+
+
+def test_first_extract_writes_everything(tmp_path, writes):
+    z = _zip(tmp_path / "v1.zip", {"Fix.asi": b"asi", "BepInEx/core/BepInEx.dll": b"core" * 1000})
+    records = quickfix.extract_zip(z, str(tmp_path / "game"))
+    assert sorted(writes) == ["BepInEx/core/BepInEx.dll", "Fix.asi"]
+    assert records["Fix.asi"]["size"] == 3
+    assert (tmp_path / "game" / "BepInEx" / "core" / "BepInEx.dll").read_bytes() == b"core" * 1000
+
+
+def test_update_writes_only_changed_members(tmp_path, writes):
+    game = str(tmp_path / "game")
+    quickfix.extract_zip(_zip(tmp_path / "v1.zip", {"Fix.asi": b"v1", "core.dll": b"core"}), game)
+    writes.clear()
+    quickfix.extract_zip(_zip(tmp_path / "v2.zip", {"Fix.asi": b"v2", "core.dll": b"core"}), game)
+    assert writes == ["Fix.asi"]
+    assert (tmp_path / "game" / "Fix.asi").read_bytes() == b"v2"
+
+
+def test_locally_modified_file_is_restored(tmp_path, writes):
+    game = tmp_path / "game"
+    z = _zip(tmp_path / "v1.zip", {"Fix.ini": b"default"})
+    quickfix.extract_zip(z, str(game))
+    (game / "Fix.ini").write_bytes(b"tweaked")  # same size, different CRC
+    writes.clear()
+    quickfix.extract_zip(z, str(game))
+    assert writes == ["Fix.ini"]
+
+
+def test_previous_records_skip_reading_unchanged_files(tmp_path, monkeypatch):
+    game = str(tmp_path / "game")
+    z = _zip(tmp_path / "v1.zip", {"big.dll": b"x" * 4096})
+    records = quickfix.extract_zip(z, game)
+    monkeypatch.setattr(quickfix, "_file_digests", lambda path: pytest.fail("file was re-read"))
+    assert quickfix.extract_zip(z, game, previous=records) == records
+
+
+def test_full_extract_rewrites_unchanged(tmp_path, writes, monkeypatch):
+    game = str(tmp_path / "game")
+    z = _zip(tmp_path / "v1.zip", {"Fix.asi": b"v1"})
+    quickfix.extract_zip(z, game)
+    monkeypatch.setattr(quickfix, "INCREMENTAL_EXTRACT", False)
+    writes.clear()
+    quickfix.extract_zip(z, game)
+    assert writes == ["Fix.asi"]
+
+
+def test_backslash_and_unsafe_entries(tmp_path):
+    game = tmp_path / "game"
+    z = _zip(tmp_path / "bad.zip", {
+        "Binaries\\Win64\\Fix.asi": b"ok",
+        "../escape.txt": b"no",
+        "/abs.txt": b"no",
+        "C:/drive.txt": b"no",
+    })
+    records = quickfix.extract_zip(z, str(game))
+    assert list(records) == ["Binaries/Win64/Fix.asi"]
+    assert (game / "Binaries" / "Win64" / "Fix.asi").read_bytes() == b"ok"
+    assert not (tmp_path / "escape.txt").exists()
+    assert os.listdir(game) == ["Binaries"]
+
+
+def test_empty_directory_entries_are_created(tmp_path):
+    game = tmp_path / "game"
+    z = _zip(tmp_path / "dirs.zip", {"BepInEx/plugins/": b"", "a.dll": b"dll", "../outside/": b""})
+    records = quickfix.extract_zip(z, str(game))
+    assert list(records) == ["a.dll"]
+    assert (game / "BepInEx" / "plugins").is_dir()
+    assert not (tmp_path / "outside").exists()
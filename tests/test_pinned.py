@@ -0,0 +1,45 @@
+import pytest
+
+import quickfix
+
+PINNED = {"repo": "Lyall/Fix", "derived_release": "1.2", "download_url": "https://codeberg.org/Lyall/Fix/Fix.zip"}
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Answers release lookups from a fake API and records each request."""
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    monkeypatch.setattr(quickfix, "USE_PINNED_RELEASES", True)
+    monkeypatch.setattr(quickfix, "_release_cache", {})
+    monkeypatch.setattr(quickfix, "RELEASE_CACHE_TTL", 0)
+    calls = []
+
+    def lookup(host, repo, url, get):
+        calls.append(host)
+        return {"status": 200, "tag": "2.0", "url": f"https://{host}/{repo}/Fix.zip"}
+    monkeypatch.setattr(quickfix, "cached_release_lookup", lookup)
+    monkeypatch.setattr(quickfix, "http_get", lambda *a, **kw: pytest.fail("unexpected request"))
+    return calls
+
+
+def test_pinned_entry_needs_no_api_call(api):
+    assert quickfix.get_release_info(PINNED) == ("1.2", PINNED["download_url"])
+    assert api == []
+
+
+@pytest.mark.parametrize("mod", [
+    {"repo": "Lyall/Fix"},
+    {"repo": "Lyall/Fix", "derived_release": "1.2"},
+    {"repo": "Lyall/Fix", "download_url": PINNED["download_url"]},
+])
+def test_entries_without_derived_data_use_the_api(api, mod):
+    assert quickfix.get_release_info(mod) == ("2.0", "https://codeberg.org/Lyall/Fix/Fix.zip")
+    assert api == ["codeberg.org"]
+
+
+def test_live_flag_disables_pinning(api, monkeypatch):
+    monkeypatch.setattr(quickfix, "load_catalog", lambda **kw: pytest.fail("catalog loaded"))
+    quickfix.main(["list-installed", "--live"])
+    assert quickfix.USE_PINNED_RELEASES is False
+    assert quickfix.get_release_info(PINNED) == ("2.0", "https://codeberg.org/Lyall/Fix/Fix.zip")
+    assert api == ["codeberg.org"]
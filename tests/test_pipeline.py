@@ -0,0 +1,158 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+import quickfix
+
+
+def _zip_bytes(name):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(f"{name}.asi", name.encode())
+    return buf.getvalue()
+
+
+@pytest.fixture
+def world(tmp_path, monkeypatch):
+    """Three installed games, one mod each, with B's release lookup the slowest."""
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.setattr(quickfix, "get_steam_index", lambda: {})
+    monkeypatch.setattr(quickfix, "get_steam_game_name", lambda appid: f"Game {appid}")
+    games = {appid: tmp_path / f"game{appid}" for appid in (1, 2, 3)}
+    monkeypatch.setattr(quickfix, "find_steam_game_install_path",
+                        lambda appid: str(games[appid]) if appid in games else None)
+    delays = {"Lyall/B": 0.05}
+
+    def fetch(repo):
+        time.sleep(delays.get(repo, 0))
+        if repo == "Lyall/D":
+            raise quickfix.RateLimitDeferred("api.github.com", 0)
+        name = repo.split("/")[1]
+        return "1.0", f"https://x/{name}.zip", None
+    monkeypatch.setattr(quickfix, "fetch_latest_release", fetch)
+
+    def download(url, dest_path, sha256=None, size=None, log=print):
+        log(f"[INFO] Downloading mod from {url}...")
+        with open(dest_path, "wb") as f:
+            f.write(_zip_bytes(url.rsplit("/", 1)[1][:-4]))
+        return dest_path
+    monkeypatch.setattr(quickfix, "download_mod_zip", download)
+
+    mods = {name: {"repo": f"Lyall/{name}", "games": [{"steam_appid": appid}]}
+            for name, appid in (("B", 1), ("A", 2), ("C", 3), ("D", 3))}
+    return mods, games
+
+
+def test_output_follows_catalog_order(world, capsys):
+    mods, games = world
+    quickfix.run_install_pipeline(["B", "A", "C"], mods, jobs=4, download_jobs=2)
+    lines = [l for l in capsys.readouterr().out.splitlines() if not l.startswith("[INFO] Downloaded")]
+    expected = []
+    for name, appid in (("B", 1), ("A", 2), ("C", 3)):
+        expected += [f"[INFO] Downloading mod from https://x/{name}.zip...",
+                     f"[INFO] Installing {name} for Game {appid} (1.0)...",
+                     f"[INFO] Extracting mod zip to {games[appid]}...",
+                     "[INFO] Wrote 1 of 1 file(s) (0.0 KB); 0 unchanged.",
+                     f"[INFO] Installation complete for Game {appid}!"]
+    assert lines == expected
+    assert (games[2] / "A.asi").read_bytes() == b"A"
+    store = quickfix.get_installed_store()
+    assert store.installed_versions("B") == {1: "1.0"}
+    assert store.all_installs()[0][0] == "A"
+
+
+def test_unpinned_archive_hash_is_recorded(world):
+    mods, _ = world
+    quickfix.run_install_pipeline(["A"], mods)
+    sha = quickfix.get_installed_store().conn.execute("SELECT sha256 FROM installs").fetchone()[0]
+    assert sha == quickfix.hashlib.sha256(_zip_bytes("A")).hexdigest()
+
+
+def test_corrupt_cached_pinned_archive_is_downloaded_again(world, capsys):
+    mods, games = world
+    sha = quickfix.hashlib.sha256(_zip_bytes("A")).hexdigest()
+    mods["A"].update(derived_release="1.0", download_url="https://x/A.zip", sha256=sha)
+    cache_path = quickfix.download_cache_path("https://x/A.zip", sha)
+    quickfix.os.makedirs(quickfix.os.path.dirname(cache_path))
+    with open(cache_path, "wb") as f:
+        f.write(_zip_bytes("corrupt"))
+    quickfix.run_install_pipeline(["A"], mods)
+    assert "failed SHA-256 verification; downloading it again" in capsys.readouterr().out
+    assert (games[2] / "A.asi").read_bytes() == b"A"
+    assert quickfix.get_installed_store().conn.execute("SELECT sha256 FROM installs").fetchone()[0] == sha
+
+
+def test_update_skips_current_mods_and_reports_deferred(world, capsys):
+    mods, _ = world
+    store = quickfix.get_installed_store()
+    store.record("A", 2, "1.0")
+    store.record("C", 3, "0.9")
+    store.record("D", 3, "0.9")
+    quickfix.run_install_pipeline(["A", "C", "D"], mods, update=True)
+    out = capsys.readouterr().out
+    assert "Mod A is already up to date (version 1.0)" in out
+    assert "Updating mod C from version 0.9 to 1.0" in out
+    assert "1 release lookup(s) deferred by the api.github.com rate limit" in out
+    assert store.get_version("C", 3) == "1.0"
+    assert store.get_version("D", 3) == "0.9"
+
+
+def test_install_all_only_resolves_mods_for_installed_games(world, monkeypatch):
+    mods, _ = world
+    mods["Z"] = {"repo": "Lyall/Z", "games": [{"steam_appid": 999}]}
+    mods["Multi"] = {"repo": "Lyall/Multi", "games": [{"steam_appid": 998}, {"steam_appid": "2"}]}
+    monkeypatch.setattr(quickfix, "get_steam_index", lambda: {1: {}, 2: {}})
+    looked_up = []
+    real_fetch = quickfix.fetch_latest_release
+    monkeypatch.setattr(quickfix, "fetch_latest_release", lambda repo: looked_up.append(repo) or real_fetch(repo))
+    quickfix.install_all_mods(mods)
+    assert sorted(looked_up) == ["Lyall/A", "Lyall/B", "Lyall/Multi"]
+
+
+def test_appid_index_keeps_catalog_order():
+    mods = {"B": {"games": [{"steam_appid": 1}]}, "A": {"games": [{"steam_appid": 1}, {"steam_appid": 2}]}}
+    assert quickfix.build_appid_index(mods) == {1: ["B", "A"], 2: ["A"]}
+    assert quickfix.match_installed_mods(mods, {2}) == ["A"]
+
+
+def test_cache_is_pruned_only_after_every_job_extracted(world, monkeypatch, capsys):
+    mods, games = world
+    monkeypatch.setattr(quickfix, "DOWNLOAD_CACHE_MAX_BYTES", 0)
+    quickfix.run_install_pipeline(["B", "A", "C"], mods, download_jobs=3)
+    assert "[ERROR]" not in capsys.readouterr().out
+    assert [(games[appid] / f"{name}.asi").exists() for name, appid in (("B", 1), ("A", 2), ("C", 3))] == [True] * 3
+    assert quickfix.os.listdir(quickfix.get_download_cache_dir()) == []
+
+
+def test_release_lookups_stay_within_jobs_and_keep_catalog_order(world, monkeypatch, capsys):
+    mods, games = world
+    names = [f"M{i}" for i in range(8)]
+    for i, name in enumerate(names):
+        mods[name] = {"repo": f"Lyall/{name}", "games": [{"steam_appid": 1}]}
+    lock = quickfix.threading.Lock()
+    running = []
+    peak = []
+
+    def fetch(repo):
+        with lock:
+            running.append(repo)
+            peak.append(len(running))
+        # Early mods are the slowest, so lookups finish in reverse order.
+        time.sleep(0.01 * (8 - int(repo[-1])))
+        with lock:
+            running.remove(repo)
+        if repo in ("Lyall/M2", "Lyall/M5"):
+            return None, None, f"Could not fetch release info for {repo}."
+        return "1.0", f"https://x/{repo.split('/')[1]}.zip", None
+    monkeypatch.setattr(quickfix, "fetch_latest_release", fetch)
+
+    quickfix.run_install_pipeline(names, mods, jobs=3)
+    assert max(peak) == 3
+    lines = [l for l in capsys.readouterr().out.splitlines()
+             if l.startswith(("[ERROR]", "[INFO] Installing"))]
+    assert lines == [
+        f"[ERROR] Could not fetch release info for Lyall/{name}." if name in ("M2", "M5")
+        else f"[INFO] Installing {name} for Game 1 (1.0)..."
+        for name in names]
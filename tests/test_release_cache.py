@@ -0,0 +1,85 @@
+import pytest
+
+import quickfix
+
+RELEASE = {"tag_name": "v1.2", "assets": [{"name": "Fix.zip", "browser_download_url": "https://x/Fix.zip"}]}
+
+
+class _Resp:
+    def __init__(self, status, payload=None, etag=None):
+        self.status_code = status
+        self.payload = payload
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self.payload
+
+
+class _Api:
+    """Answers release lookups for one host and records the request headers."""
+
+    def __init__(self, status, payload=None, etag=None):
+        self.status, self.payload, self.etag = status, payload, etag
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers)
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            return _Resp(304)
+        return _Resp(self.status, self.payload, self.etag)
+
+
+@pytest.fixture
+def apis(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    monkeypatch.setattr(quickfix, "_release_cache", None)
+    clock = [1000.0]
+    monkeypatch.setattr(quickfix.time, "time", lambda: clock[0])
+
+    def install(codeberg, github):
+        monkeypatch.setattr(quickfix, "codeberg_get", codeberg.get)
+        monkeypatch.setattr(quickfix, "github_get", github.get)
+        return clock
+    return install
+
+
+def _lookup():
+    release = quickfix.get_latest_release_info("Lyall/Fix")
+    quickfix._release_cache = None  # the next call starts from disk, like a new run
+    return release
+
+
+def test_fresh_entries_need_no_request(apis):
+    codeberg, github = _Api(200, RELEASE, '"e1"'), _Api(404)
+    apis(codeberg, github)
+    assert _lookup() == ("v1.2", "https://x/Fix.zip")
+    assert _lookup() == ("v1.2", "https://x/Fix.zip")
+    assert len(codeberg.requests) == 1 and github.requests == []
+
+
+def test_stale_entry_revalidates_with_etag(apis):
+    codeberg, github = _Api(200, RELEASE, '"e1"'), _Api(404)
+    clock = apis(codeberg, github)
+    _lookup()
+    clock[0] += quickfix.RELEASE_CACHE_TTL + 1
+    assert _lookup() == ("v1.2", "https://x/Fix.zip")
+    assert codeberg.requests[-1] == {"If-None-Match": '"e1"'}
+    # The 304 refreshed the entry, so it is fresh again.
+    _lookup()
+    assert len(codeberg.requests) == 2
+
+
+def test_codeberg_404_is_cached(apis):
+    codeberg, github = _Api(404), _Api(200, RELEASE, '"g1"')
+    apis(codeberg, github)
+    for _ in range(2):
+        assert _lookup() == ("v1.2", "https://x/Fix.zip")
+    assert len(codeberg.requests) == 1 and len(github.requests) == 1
+
+
+def test_errors_are_not_cached(apis):
+    codeberg, github = _Api(404), _Api(403)
+    apis(codeberg, github)
+    assert _lookup() == (None, None)
+    assert _lookup() == (None, None)
+    assert len(github.requests) == 2
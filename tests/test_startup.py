@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+QUICKFIX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quickfix.py")
+# Cold start of a local-only command, interpreter included. Generous enough
+# for a loaded CI runner, tight enough to catch an eager `import requests`
+# or a catalog fetch sneaking back into startup.
+STARTUP_BUDGET = 1.0
+
+
+@pytest.fixture
+def env(tmp_path):
+    return {**os.environ, "APPDATA": str(tmp_path), "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def _run(env, *args):
+    return subprocess.run([sys.executable, QUICKFIX, *args], env=env, capture_output=True,
+                          text=True, timeout=30)
+
+
+def test_list_installed_loads_no_network_modules(env):
+    result = _run(env, "list-installed", "--startup-profile")
+    assert result.returncode == 0
+    assert "No mods are currently installed" in result.stdout
+    assert "Fetching" not in result.stdout
+    assert "deferred modules loaded: none" in result.stderr
+
+
+def test_list_installed_cold_start_budget(env):
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        assert _run(env, "list-installed").returncode == 0
+        timings.append(time.perf_counter() - start)
+    assert min(timings) < STARTUP_BUDGET, f"list-installed took {min(timings):.2f}s"
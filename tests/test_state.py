@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import quickfix
+
+
+@pytest.fixture
+def appdata(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    return tmp_path / "QuickFix"
+
+
+def test_versions_are_tracked_per_game(appdata):
+    store = quickfix.get_installed_store()
+    store.record("Fix", 10, "1.0", "a" * 64)
+    store.record("Fix", 20, "1.1")
+    assert store.get_version("Fix", 10) == "1.0"
+    assert store.get_version("Fix", 30) is None
+    assert store.installed_versions("Fix") == {10: "1.0", 20: "1.1"}
+
+
+def test_installed_json_is_migrated_once(appdata):
+    appdata.mkdir()
+    (appdata / "installed.json").write_text(json.dumps({"Fix": "1.0", "Other": "2.0"}))
+    store = quickfix.get_installed_store()
+    assert not (appdata / "installed.json").exists()
+    assert (appdata / "installed.json.migrated").exists()
+    assert store.installed_mod_ids() == ["Fix", "Other"]
+    # Legacy rows only mark the mod installed; the first per-game install replaces them.
+    assert store.installed_versions("Fix") == {quickfix.LEGACY_APPID: "1.0"}
+    assert store.get_version("Fix", 42) is None
+    store.record("Fix", 42, "1.1")
+    assert store.installed_versions("Fix") == {42: "1.1"}
+    assert store.get_version("Fix", 7) is None
+    assert [row[:3] for row in store.all_installs()] == [("Fix", 42, "1.1"), ("Other", 0, "2.0")]
+
+
+def test_migrated_mod_is_updated_once(appdata, monkeypatch, capsys):
+    appdata.mkdir()
+    (appdata / "installed.json").write_text(json.dumps({"Fix": "1.0"}))
+    mods = {"Fix": {"repo": "Lyall/Fix", "games": [{"steam_appid": 42}]}}
+    monkeypatch.setattr(quickfix, "get_release_info", lambda mod: ("1.1", "https://x/Fix.zip"))
+
+    def install_mod(mod_id, mods, force=False, release=None):
+        quickfix.get_installed_store().record(mod_id, 42, release[0])
+    monkeypatch.setattr(quickfix, "install_mod", install_mod)
+    quickfix.update_mod("Fix", mods)
+    assert "Updating mod Fix from version 1.0 to 1.1" in capsys.readouterr().out
+    quickfix.update_mod("Fix", mods)
+    assert "already up to date" in capsys.readouterr().out
+    quickfix.list_installed_mods()
+    out = capsys.readouterr().out
+    assert "Fix: 1.1" in out and "Fix: 1.0" not in out
+
+
+def test_batch_commits_on_exit_and_every_batch_size(appdata, monkeypatch):
+    monkeypatch.setattr(quickfix, "STATE_BATCH_SIZE", 2)
+    store = quickfix.get_installed_store()
+    other = quickfix.InstalledStore(store.path)
+    with store.batch():
+        store.record("A", 1, "1")
+        assert other.get_version("A", 1) is None
+        store.record("B", 1, "1")
+        assert other.get_version("A", 1) == "1"
+        store.record("C", 1, "1")
+        assert other.get_version("C", 1) is None
+    assert other.get_version("C", 1) == "1"
+
+
+def test_list_installed_does_not_scan_libraries(appdata, monkeypatch, capsys):
+    monkeypatch.setattr(quickfix, "get_steam_index", lambda: pytest.fail("scanned Steam libraries"))
+    quickfix.get_installed_store().record("Fix", 42, "1.0")
+    quickfix.list_installed_mods()
+    assert "- Fix: 1.0 (Steam App 42, installed " in capsys.readouterr().out
@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+
+import pytest
+
+import quickfix
+
+
+def _manifest(library, appid, installdir, create_dir=True, name=None):
+    steamapps = library / "steamapps"
+    steamapps.mkdir(parents=True, exist_ok=True)
+    (steamapps / f"appmanifest_{appid}.acf").write_text(
+        f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"{name or installdir}"\n'
+        f'\t"installdir"\t\t"{installdir}"\n}}\n',
+        encoding="utf-8")
+    if create_dir:
+        (steamapps / "common" / installdir).mkdir(parents=True)
+
+
+def _steam_root(tmp_path, *libraries):
+    root = tmp_path / "Steam"
+    (root / "steamapps").mkdir(parents=True)
+    entries = "".join(f'\t"{i}"\n\t{{\n\t\t"path"\t\t"{lib}"\n\t}}\n' for i, lib in enumerate(libraries))
+    (root / "steamapps" / "libraryfolders.vdf").write_text(
+        f'"libraryfolders"\n{{\n{entries}}}\n', encoding="utf-8")
+    return root
+
+
+def _roundtrip(cache):
+    """What load_steam_index_cache would hand back after a save."""
+    return json.loads(json.dumps({k: v for k, v in cache.items() if k != "dirty"}))
+
+
+def test_index_covers_root_and_vdf_libraries(tmp_path):
+    extra = tmp_path / "SteamLibrary"
+    root = _steam_root(tmp_path, extra)
+    _manifest(root, 10, "RootGame")
+    _manifest(extra, 20, "ExtraGame")
+
+    index = quickfix.build_steam_index(str(root))
+    assert set(index) == {10, 20}
+    assert index[20]["install_path"] == str(extra / "steamapps" / "common" / "ExtraGame")
+    assert index[20]["library"] == str(extra / "steamapps")
+
+
+def test_index_skips_apps_without_install_folder(tmp_path):
+    root = _steam_root(tmp_path)
+    _manifest(root, 10, "Gone", create_dir=False)
+    assert quickfix.build_steam_index(str(root)) == {}
+
+
+def test_explicit_library_dirs_without_steam_root(tmp_path):
+    lib_a, lib_b = tmp_path / "A", tmp_path / "B"
+    _manifest(lib_a, 1, "One")
+    _manifest(lib_b, 2, "Two")
+    # Both the library root and its steamapps folder are accepted.
+    index = quickfix.build_steam_index(None, [str(lib_a), str(lib_b / "steamapps")])
+    assert set(index) == {1, 2}
+
+
+def test_first_library_wins_on_duplicate_appid(tmp_path):
+    lib_a, lib_b = tmp_path / "A", tmp_path / "B"
+    _manifest(lib_a, 1, "Game")
+    _manifest(lib_b, 1, "Game")
+    index = quickfix.build_steam_index(None, [str(lib_a), str(lib_b), str(lib_a)])
+    assert index[1]["library"] == str(lib_a / "steamapps")
+
+
+def test_find_install_path_builds_index_once(tmp_path, monkeypatch):
+    lib = tmp_path / "Lib"
+    _manifest(lib, 42, "Answer")
+    monkeypatch.setattr(quickfix, "_steam_index", None)
+    monkeypatch.setattr(quickfix, "STEAM_ROOT", None)
+    monkeypatch.setattr(quickfix, "EXTRA_STEAM_LIBRARIES", [str(lib)])
+    monkeypatch.setattr(quickfix, "get_steam_root", lambda: None)
+    calls = []
+    real_build = quickfix.build_steam_index
+    monkeypatch.setattr(quickfix, "build_steam_index",
+                        lambda *a, **kw: calls.append(a) or real_build(*a, **kw))
+
+    assert quickfix.find_steam_game_install_path(42).endswith("Answer")
+    assert quickfix.find_steam_game_install_path(7) is None
+    assert len(calls) == 1
+
+
+def test_warm_cache_skips_manifest_parsing(tmp_path, monkeypatch):
+    extra = tmp_path / "SteamLibrary"
+    root = _steam_root(tmp_path, extra)
+    _manifest(root, 10, "RootGame")
+    _manifest(extra, 20, "ExtraGame")
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+
+    cache = {}
+    cold = quickfix.build_steam_index(str(root), cache=cache)
+    assert cache["dirty"]
+    quickfix.save_steam_index_cache(cache)
+
+    def fail(*args):
+        raise AssertionError("manifest parsed on a warm run")
+    monkeypatch.setattr(quickfix, "parse_app_manifest", fail)
+    monkeypatch.setattr(quickfix, "parse_libraryfolders", fail)
+    warm_cache = quickfix.load_steam_index_cache()
+    assert quickfix.build_steam_index(str(root), cache=warm_cache) == cold
+    assert not warm_cache["dirty"]
+
+
+def test_cache_rescans_only_changed_library(tmp_path, monkeypatch):
+    extra = tmp_path / "SteamLibrary"
+    root = _steam_root(tmp_path, extra)
+    _manifest(root, 10, "RootGame")
+    _manifest(extra, 20, "ExtraGame")
+    cache = {}
+    quickfix.build_steam_index(str(root), cache=cache)
+    cache = _roundtrip(cache)
+
+    _manifest(extra, 30, "NewGame")
+    steamapps = extra / "steamapps"
+    st = os.stat(steamapps)
+    os.utime(steamapps, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    scanned = []
+    real_scan = quickfix.scan_steam_library
+    monkeypatch.setattr(quickfix, "scan_steam_library",
+                        lambda lib: scanned.append(lib) or real_scan(lib))
+
+    index = quickfix.build_steam_index(str(root), cache=cache)
+    assert set(index) == {10, 20, 30}
+    assert scanned == [str(steamapps)]
+
+
+def test_game_names_come_from_manifests_and_survive_uninstall(tmp_path, monkeypatch):
+    lib = tmp_path / "Lib"
+    _manifest(lib, 42, "Answer", name="The Answer: Deluxe")
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.setattr(quickfix, "_game_names", None)
+    monkeypatch.setattr(quickfix, "http_get", lambda *a, **kw: pytest.fail("store API called"))
+
+    monkeypatch.setattr(quickfix, "get_steam_index", lambda: quickfix.build_steam_index(None, [str(lib)]))
+    assert quickfix.get_steam_game_name(42) == "The Answer: Deluxe"
+    quickfix.remember_game_names(quickfix.build_steam_index(None, [str(lib)]))
+
+    monkeypatch.setattr(quickfix, "_game_names", None)
+    monkeypatch.setattr(quickfix, "get_steam_index", lambda: {})
+    assert quickfix.get_steam_game_name(42) == "The Answer: Deluxe"
+    assert quickfix.get_steam_game_name(7) == "Steam App 7"
+
+
+def test_winreg_is_imported_on_first_registry_lookup(monkeypatch):
+    class FakeWinreg:
+        HKEY_CURRENT_USER = "HKCU"
+
+        @staticmethod
+        def OpenKey(root, path):
+            return path
+
+        @staticmethod
+        def QueryValueEx(key, name):
+            return "C:/Steam", 1
+    monkeypatch.setattr(quickfix, "winreg", None)
+    monkeypatch.setattr(quickfix, "STEAM_ROOT", None)
+    monkeypatch.setitem(sys.modules, "winreg", FakeWinreg)
+    assert quickfix.get_steam_root() == "C:/Steam"
+    assert quickfix.winreg is FakeWinreg
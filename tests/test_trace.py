@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import quickfix
+import tracing
+
+
+@pytest.fixture
+def trace(monkeypatch):
+    monkeypatch.setattr(quickfix, "_trace_events", [])
+
+
+def test_spans_are_written_as_chrome_trace(trace, tmp_path):
+    with quickfix.trace_span("outer", mod_id="Fix"):
+        with quickfix.trace_span("inner", appid=42) as span:
+            span["files"] = 3
+    path = tmp_path / "trace.json"
+    quickfix.write_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    [meta] = [e for e in events if e["ph"] == "M"]
+    assert meta["args"] == {"name": "MainThread"}
+    outer, = (e for e in events if e["name"] == "outer")
+    inner, = (e for e in events if e["name"] == "inner")
+    assert inner["args"] == {"appid": 42, "files": 3}
+    assert outer["tid"] == inner["tid"] == meta["tid"]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_http_spans_record_host_status_and_bytes(trace, monkeypatch):
+    class Resp:
+        status_code = 200
+        headers = {"Content-Length": "512"}
+
+    class Session:
+        def get(self, url, **kwargs):
+            return Resp()
+    monkeypatch.setattr(quickfix, "get_http_session", lambda host: Session())
+    monkeypatch.setattr(quickfix, "_host_schedulers", {})
+    quickfix.http_get("https://codeberg.org/api/v1/repos/Lyall/Fix/releases/latest")
+    [event] = quickfix._trace_events
+    assert event["args"] == {"host": "codeberg.org", "path": "/api/v1/repos/Lyall/Fix/releases/latest",
+                             "attempt": 1, "status": 200, "bytes": 512}
+
+
+def test_failed_spans_record_the_error(trace):
+    with pytest.raises(OSError):
+        with quickfix.trace_span("extract", mod_id="Fix"):
+            raise OSError("disk full")
+    assert quickfix._trace_events[0]["args"] == {"mod_id": "Fix", "error": "OSError"}
+
+
+def test_tracing_is_off_by_default():
+    assert quickfix._trace_events is None
+    with quickfix.trace_span("noop") as span:
+        span["x"] = 1
+    assert quickfix._trace_events is None
+
+
+def test_script_tracing_writes_env_file(monkeypatch, tmp_path):
+    path = tmp_path / "scripts.json"
+    monkeypatch.setattr(tracing, "TRACE_PATH", str(path))
+    monkeypatch.setattr(tracing, "_events", [])
+    with tracing.span("derive", mod_id="Fix"):
+        pass
+    tracing.write()
+    [event] = json.loads(path.read_text())["traceEvents"]
+    assert event["name"] == "derive" and event["args"] == {"mod_id": "Fix"}
@@ -0,0 +1,135 @@
+import pytest
+import requests
+
+import quickfix
+
+
+class _Resp:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+class _Session:
+    """Stands in for requests.Session; replays a scripted list of outcomes."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, tuple):
+            return _Resp(*outcome)
+        return _Resp(outcome)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(quickfix.time, "sleep", lambda s: None)
+
+    def install(*outcomes):
+        fake = _Session(outcomes)
+        monkeypatch.setattr(quickfix, "get_http_session", lambda host: fake)
+        monkeypatch.setattr(quickfix, "_host_schedulers", {})
+        return fake
+    return install
+
+
+def test_transient_status_is_retried(session):
+    fake = session(503, 200)
+    assert quickfix.http_get("https://codeberg.org/x").status_code == 200
+    assert fake.calls == 2
+
+
+def test_client_error_is_not_retried(session):
+    fake = session(404, 200)
+    assert quickfix.http_get("https://codeberg.org/x").status_code == 404
+    assert fake.calls == 1
+
+
+def test_connection_errors_retry_then_raise(session):
+    fake = session(requests.ConnectionError("reset"), requests.Timeout("slow"),
+                   requests.ConnectionError("reset"))
+    with pytest.raises(requests.ConnectionError):
+        quickfix.http_get("https://codeberg.org/x", retries=3)
+    assert fake.calls == 3
+
+
+def test_last_transient_response_is_returned(session):
+    session(502, 502)
+    assert quickfix.http_get("https://codeberg.org/x", retries=2).status_code == 502
+
+
+def test_retry_delay_grows_with_jitter():
+    for attempt in range(4):
+        base = quickfix.RETRY_BASE_DELAY * 2 ** attempt
+        assert base <= quickfix._retry_delay(attempt) <= 2 * base
+
+
+def test_sessions_are_pooled_per_host(monkeypatch):
+    monkeypatch.setattr(quickfix, "_http_sessions", {})
+    a = quickfix.get_http_session("codeberg.org")
+    assert quickfix.get_http_session("codeberg.org") is a
+    assert quickfix.get_http_session("api.github.com") is not a
+
+
+def test_session_keeps_pools_for_redirect_targets(monkeypatch):
+    monkeypatch.setattr(quickfix, "_http_sessions", {})
+    manager = quickfix.get_http_session("github.com").get_adapter("https://github.com").poolmanager
+    manager.connection_from_host("github.com", 443, "https")
+    manager.connection_from_host("objects.githubusercontent.com", 443, "https")
+    assert len(manager.pools) == 2
+
+
+def test_exhausted_budget_defers_without_sending(session, monkeypatch):
+    monkeypatch.setattr(quickfix.time, "time", lambda: 1000.0)
+    fake = session((200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "4600"}), 200)
+    quickfix.http_get("https://api.github.com/a")
+    with pytest.raises(quickfix.RateLimitDeferred) as exc:
+        quickfix.http_get("https://api.github.com/b")
+    assert exc.value.reset_at == 4600
+    assert fake.calls == 1
+
+
+def test_short_retry_after_is_waited_out(session, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(quickfix.time, "time", lambda: clock[0])
+    fake = session((429, {"Retry-After": "5"}), 200)
+    scheduler = quickfix.get_host_scheduler("api.github.com")
+    monkeypatch.setattr(scheduler, "cond", _FakeCondition(clock))
+    assert quickfix.http_get("https://api.github.com/a").status_code == 200
+    assert fake.calls == 2 and clock[0] == 1005.0
+
+
+def test_budget_caps_concurrency():
+    scheduler = quickfix.HostScheduler("api.github.com", max_concurrency=8)
+    assert scheduler._limit(0) == 8
+    scheduler.remaining, scheduler.reset_at = 3, 100
+    assert scheduler._limit(0) == 3
+    assert scheduler._limit(100) == 8  # the window has reset
+
+
+class _FakeCondition:
+    """threading.Condition whose wait() advances a fake clock instead of blocking."""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def wait(self, timeout=None):
+        self.clock[0] += timeout
+
+    def notify_all(self):
+        pass
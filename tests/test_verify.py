@@ -0,0 +1,53 @@
+import zipfile
+
+import pytest
+
+import quickfix
+
+MEMBERS = {"Fix.asi": b"asi" * 100, "Fix.ini": b"[Settings]\n", "dsound.dll": b"dll" * 100, "empty.txt": b""}
+
+
+@pytest.fixture
+def install(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    monkeypatch.setattr(quickfix, "get_steam_game_name", lambda appid: f"Game {appid}")
+    zip_path = tmp_path / "Fix.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for name, data in MEMBERS.items():
+            zf.writestr(name, data)
+    game = tmp_path / "game"
+    mod = {"repo": "Lyall/Fix", "config_files": ["Fix.ini"]}
+    records = quickfix.extract_zip(str(zip_path), str(game))
+    quickfix.record_install(mod, "Fix", 42, "1.0", str(game), str(zip_path), "https://x/Fix.zip", records)
+    return game
+
+
+def test_manifest_records_every_file(install):
+    manifest = quickfix.load_install_manifest("Fix", 42)
+    assert set(manifest["files"]) == set(MEMBERS)
+    assert manifest["files"]["Fix.ini"]["config"] is True
+    assert manifest["files"]["dsound.dll"]["size"] == 300
+
+
+def test_intact_install_verifies_clean(install):
+    [(_, problems)] = quickfix.verify_installs(quickfix.load_install_manifests())
+    assert problems == {}
+
+
+def test_verify_reports_missing_and_modified_but_not_config_edits(install):
+    (install / "dsound.dll").unlink()
+    (install / "Fix.asi").write_bytes(b"ASI" * 100)  # same size, different content
+    (install / "Fix.ini").write_bytes(b"[Settings]\nFov=90\n")
+    [(_, problems)] = quickfix.verify_installs(quickfix.load_install_manifests())
+    assert problems == {"dsound.dll": "missing", "Fix.asi": "modified"}
+
+
+def test_repair_restores_only_broken_files(install, capsys):
+    (install / "dsound.dll").unlink()
+    (install / "Fix.ini").write_bytes(b"user settings")
+    quickfix.verify_command(repair=True)
+    assert (install / "dsound.dll").read_bytes() == MEMBERS["dsound.dll"]
+    assert (install / "Fix.ini").read_bytes() == b"user settings"
+    assert "Repaired 1 file(s)" in capsys.readouterr().out
+    [(_, problems)] = quickfix.verify_installs(quickfix.load_install_manifests())
+    assert problems == {}
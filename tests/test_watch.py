@@ -0,0 +1,111 @@
+import os
+import threading
+
+import pytest
+
+import quickfix
+
+
+def _manifest(library, appid, flags, installdir="Game"):
+    """Write an appmanifest the way Steam does: to a temp file, renamed into place."""
+    path = library / f"appmanifest_{appid}.acf"
+    temp = library / f"appmanifest_{appid}.acf.tmp"
+    temp.write_text(f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"Game {appid}"\n'
+                    f'\t"StateFlags"\t\t"{flags}"\n\t"installdir"\t\t"{installdir}"\n}}\n')
+    if path.exists():
+        os.utime(temp, ns=(0, os.stat(path).st_mtime_ns + 10_000_000))
+    os.replace(temp, path)
+    _touch(library)
+    return path
+
+
+def _touch(path):
+    """Move path's mtime forward so changes are seen on coarse-mtime filesystems."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+@pytest.fixture
+def library(tmp_path):
+    steamapps = tmp_path / "steamapps"
+    (steamapps / "common").mkdir(parents=True)
+    return steamapps
+
+
+def test_manifest_state_flags_are_parsed(library):
+    fields = quickfix.parse_app_manifest(str(_manifest(library, 10, 1026)))
+    assert fields == {"installdir": "Game", "name": "Game 10", "state_flags": 1026}
+
+
+def test_only_games_that_finish_installing_are_reported(library):
+    _manifest(library, 10, 4)
+    _manifest(library, 20, 1026)
+    watcher = quickfix.ManifestWatcher([str(library)])
+    assert watcher.poll() == []
+
+    _manifest(library, 20, 4)
+    _manifest(library, 30, 4)
+    assert sorted(watcher.poll()) == [20, 30]
+    _manifest(library, 20, 4)
+    assert watcher.poll() == []
+
+
+def test_unchanged_library_is_not_rescanned(library, monkeypatch):
+    _manifest(library, 10, 4)
+    watcher = quickfix.ManifestWatcher([str(library)])
+    monkeypatch.setattr(quickfix, "parse_app_manifest", lambda path: pytest.fail("manifest re-read"))
+    assert watcher.poll() == []
+
+
+def test_reinstalled_game_is_reported_again(library):
+    manifest = _manifest(library, 10, 4)
+    watcher = quickfix.ManifestWatcher([str(library)])
+    manifest.unlink()
+    _touch(library)
+    assert watcher.poll() == []
+    _manifest(library, 10, 4)
+    assert watcher.poll() == [10]
+
+
+def test_polling_loop_hands_new_games_to_callback(library, monkeypatch):
+    stop = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    class Watcher(quickfix.ManifestWatcher):
+        def __init__(self, libraries):
+            super().__init__(libraries)
+            started.set()
+    monkeypatch.setattr(quickfix, "ManifestWatcher", Watcher)
+
+    def on_installed(appids):
+        seen.extend(appids)
+        stop.set()
+    _manifest(library, 10, 1026)
+    thread = threading.Thread(target=quickfix.watch_libraries,
+                              args=([str(library)], on_installed, 0.01, stop, False))
+    thread.start()
+    try:
+        assert started.wait(5)
+        _manifest(library, 10, 4)
+        thread.join(5)
+    finally:
+        stop.set()
+        thread.join()
+    assert seen == [10]
+
+
+def test_watch_installs_only_matching_mods(monkeypatch, capsys):
+    mods = {"AFix": {"games": [{"steam_appid": 10}]},
+            "BFix": {"games": [{"steam_appid": 20}]},
+            "CFix": {"games": [{"steam_appid": 10}, {"steam_appid": 30}]}}
+    installed = []
+    monkeypatch.setattr(quickfix, "get_steam_libraries", lambda: ["steamapps"])
+    monkeypatch.setattr(quickfix, "get_steam_index", lambda: {10: {"name": "Ten"}})
+    monkeypatch.setattr(quickfix, "run_install_pipeline",
+                        lambda mod_ids, mods, **kwargs: installed.extend(mod_ids))
+    monkeypatch.setattr(quickfix, "watch_libraries",
+                        lambda libraries, on_installed, interval: on_installed([10]))
+    quickfix.watch_command(mods, offline=True)
+    assert installed == ["AFix", "CFix"]
+    assert "Finished installing: Ten." in capsys.readouterr().out